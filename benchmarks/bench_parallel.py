@@ -0,0 +1,49 @@
+"""Scaling of simulate_gbm_parallel from 1 to N workers.
+
+Run from the repo root with `python -m benchmarks.bench_parallel`. Times the full-path simulation
+(chunked, reducing to moments + histogram counts) for each backend and worker count, and checks
+every run reproduces the single-worker price bit for bit.
+"""
+import argparse
+import os
+import time
+
+from options_explainer.engine import simulate_gbm_parallel
+
+
+def worker_counts(max_workers):
+    counts = [1]
+    while counts[-1]*2 <= max_workers:
+        counts.append(counts[-1]*2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-paths', type=int, default=200_000)
+    parser.add_argument('--chunk-size', type=int, default=10_000)
+    parser.add_argument('--n', type=int, default=24)
+    parser.add_argument('--T', type=int, default=30)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--backends', nargs='+', default=['thread', 'process'])
+    args = parser.parse_args()
+
+    kwargs = dict(n=args.n, T=args.T, num_paths=args.num_paths, seed=0, chunk_size=args.chunk_size, strike_value=205)
+    print(f"{args.num_paths} paths x {args.n*args.T+1} steps, chunks of {args.chunk_size}, {os.cpu_count()} cpus")
+    print(f"{'backend':>8} {'workers':>8} {'seconds':>9} {'speedup':>8} {'paths/s':>12} {'same price':>11}")
+    for backend in args.backends:
+        baseline = None
+        for workers in worker_counts(args.max_workers):
+            start = time.perf_counter()
+            result = simulate_gbm_parallel(200, 0.0, 0.005, backend=backend, workers=workers, **kwargs)
+            elapsed = time.perf_counter() - start
+            if baseline is None:
+                baseline = (elapsed, result.payoff.mean)
+            print(f"{backend:>8} {workers:>8} {elapsed:>9.3f} {baseline[0]/elapsed:>8.2f} {args.num_paths/elapsed:>12,.0f} "
+                  f"{str(result.payoff.mean == baseline[1]):>11}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""Pseudo-random vs scrambled Sobol: error against the exact answer as num_paths grows.
+
+Run from the repo root with `python -m benchmarks.bench_qmc`. For each sampler and path count the
+call price and the terminal histogram are estimated from independent seeds, and the RMSE against
+Black-Scholes / the exact lognormal bin probabilities is reported, along with the fitted
+convergence rate and the paths needed to reach each target error.
+"""
+import argparse
+
+import numpy as np
+
+from options_explainer.engine import bs_price, price_call, simulate_gbm, simulate_gbm_terminal
+from options_explainer.engine._normal import norm_cdf
+
+S0, MU, SIGMA, T, STRIKE = 200, 0.0, 0.005, 30, 205
+BIN_EDGES = np.linspace(170, 230, 21)
+
+
+def exact_bin_probabilities():
+    total_vol = SIGMA*np.sqrt(T)
+    z = (np.log(BIN_EDGES/S0) - (MU - 0.5*SIGMA**2)*T)/total_vol
+    return np.diff(norm_cdf(z))
+
+
+def errors(sample_terminal, sizes, replications):
+    exact_price = float(bs_price(S0, STRIKE, T, SIGMA))
+    exact_bins = exact_bin_probabilities()
+    price_rmse, hist_l1 = [], []
+    for num_paths in sizes:
+        price_err, bin_err = [], []
+        for seed in range(replications):
+            end_values = sample_terminal(num_paths, np.random.default_rng(seed))
+            price_err.append(price_call(end_values, STRIKE) - exact_price)
+            counts, _ = np.histogram(end_values, bins=BIN_EDGES)
+            bin_err.append(np.abs(counts/num_paths - exact_bins).sum())
+        price_rmse.append(np.sqrt(np.mean(np.square(price_err))))
+        hist_l1.append(np.mean(bin_err))
+    return np.array(price_rmse), np.array(hist_l1)
+
+
+def paths_needed(sizes, errs, target):
+    below = np.flatnonzero(errs <= target)
+    return int(sizes[below[0]]) if below.size else None
+
+
+def report(title, sizes, results, targets):
+    print(f"\n{title}")
+    print(f"{'num_paths':>10}" + "".join(f"{name:>14}" for name in results))
+    for i, num_paths in enumerate(sizes):
+        print(f"{num_paths:>10}" + "".join(f"{errs[i]:>14.3e}" for errs in results.values()))
+    for name, errs in results.items():
+        slope = np.polyfit(np.log(sizes), np.log(errs), 1)[0]
+        print(f"{name}: error ~ N^{slope:.2f}")
+    for target in targets:
+        needed = ", ".join(f"{name}={paths_needed(sizes, errs, target)}" for name, errs in results.items())
+        print(f"paths needed for error <= {target:g}: {needed}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--max-log2-paths', type=int, default=16)
+    parser.add_argument('--replications', type=int, default=32)
+    parser.add_argument('--steps-per-day', type=int, default=4, help='n for the multi-step (Brownian bridge) comparison')
+    args = parser.parse_args()
+
+    sizes = 2**np.arange(6, args.max_log2_paths + 1)
+    terminal = {}
+    histogram = {}
+    for sampler in ('pseudo', 'sobol'):
+        price_rmse, hist_l1 = errors(lambda N, rng: simulate_gbm_terminal(S0, MU, SIGMA, T=T, num_paths=N, rng=rng, sampler=sampler),
+                                     sizes, args.replications)
+        terminal[sampler] = price_rmse
+        histogram[sampler] = hist_l1
+    report('Call price RMSE, terminal sampler', sizes, terminal, targets=(1e-2, 1e-3))
+    report('Terminal histogram mean L1 error', sizes, histogram, targets=(1e-2, 3e-3))
+
+    # full paths are much bigger, so stop a few powers of two earlier
+    path_sizes = sizes[sizes <= 2**min(args.max_log2_paths, 13)]
+    paths = {}
+    for sampler in ('pseudo', 'sobol'):
+        paths[sampler], _ = errors(lambda N, rng: simulate_gbm(S0, MU, SIGMA, n=args.steps_per_day, T=T, num_paths=N, rng=rng,
+                                                             sampler=sampler).terminal,
+                                   path_sizes, args.replications)
+    report(f'Call price RMSE, {args.steps_per_day*T}-step paths (Sobol uses a Brownian bridge)', path_sizes, paths, targets=(1e-2,))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Cold-start cost of the app: import times and time to first paint.
+
+Run from the repo root with `python -m benchmarks.bench_startup`. Every measurement runs in a fresh
+interpreter, so nothing is already in sys.modules:
+
+- import: wall time of importing each of the app's modules, and which heavy modules that pulled in.
+  The engine must load neither plotly, pandas, scipy nor streamlit, and the chart builders in
+  rendering must not load plotly's figure machinery (or pandas, through plotly.express) until a
+  figure is built. A module that does is reported as a violation and the exit status is 1.
+- first paint: the page run headless under Streamlit's AppTest, with the time from the start of the
+  run (streamlit itself already imported, as it is in a running server) to the page's first
+  st.title call, and to the end of the full run.
+
+--budget-import and --budget-first-paint (seconds) also fail the run when a best time is over them.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# plotly.graph_objects itself is a lazy package (streamlit imports it); the cost is in the figure
+# classes, which load with plotly.graph_objs._figure on the first go.Figure
+FIGURES = 'plotly.graph_objs._figure'
+# module -> heavy modules importing it must not load
+IMPORTS = {
+    'options_explainer.engine': ('plotly', 'pandas', 'scipy', 'streamlit'),
+    'options_explainer.rendering': (FIGURES, 'plotly.express', 'pandas'),
+    'utils.util_functions': (FIGURES, 'plotly.express'),
+}
+HEAVY = ('numpy', 'pandas', 'scipy', 'plotly', FIGURES, 'plotly.express', 'streamlit')
+
+_IMPORT_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps(dict(seconds=seconds, loaded=[m for m in {heavy!r} if m in sys.modules])))
+"""
+
+_PAINT_SNIPPET = """
+import json, time
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+marks = {{}}
+title = st.title
+
+def timed_title(*args, **kwargs):
+    marks.setdefault('first_paint', time.perf_counter())
+    return title(*args, **kwargs)
+
+st.title = timed_title
+at = AppTest.from_file({script!r}, default_timeout=300)
+start = time.perf_counter()
+at.run()
+end = time.perf_counter()
+print(json.dumps(dict(first_paint_seconds=marks['first_paint'] - start, run_seconds=end - start,
+                      exceptions=[str(e.value) for e in at.exception])))
+"""
+
+
+def _run_snippet(code):
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=os.getcwd())
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_imports(repeat):
+    results = []
+    for module, forbidden in IMPORTS.items():
+        runs = [_run_snippet(_IMPORT_SNIPPET.format(module=module, heavy=HEAVY)) for _ in range(repeat)]
+        loaded = runs[0]['loaded']
+        results.append(dict(module=module, seconds_min=min(r['seconds'] for r in runs), loaded=loaded,
+                            violations=[m for m in forbidden if m in loaded]))
+    return results
+
+
+def measure_first_paint(repeat, script):
+    runs = [_run_snippet(_PAINT_SNIPPET.format(script=os.path.abspath(script))) for _ in range(repeat)]
+    return dict(script=script, first_paint_seconds_min=min(r['first_paint_seconds'] for r in runs),
+                run_seconds_min=min(r['run_seconds'] for r in runs), exceptions=runs[0]['exceptions'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--script', default='main_page.py')
+    parser.add_argument('--skip-first-paint', action='store_true', help="only measure imports (doesn't need streamlit's AppTest)")
+    parser.add_argument('--budget-import', type=float, help='fail if any module takes longer than this to import')
+    parser.add_argument('--budget-first-paint', type=float, help='fail if the first paint takes longer than this')
+    parser.add_argument('--output', help='file to write the JSON results to (default: stdout)')
+    args = parser.parse_args()
+
+    failures = []
+    imports = measure_imports(args.repeat)
+    for record in imports:
+        print(f"{record['module']:<28} {record['seconds_min']*1e3:>8.1f}ms loads {', '.join(record['loaded']) or '-'}",
+              file=sys.stderr)
+        if record['violations']:
+            failures.append(f"{record['module']} loads {', '.join(record['violations'])}")
+        if args.budget_import is not None and record['seconds_min'] > args.budget_import:
+            failures.append(f"{record['module']} took {record['seconds_min']:.3f}s to import")
+
+    report = dict(imports=imports)
+    if not args.skip_first_paint:
+        paint = report['first_paint'] = measure_first_paint(args.repeat, args.script)
+        print(f"{'first paint':<28} {paint['first_paint_seconds_min']*1e3:>8.1f}ms, "
+              f"full run {paint['run_seconds_min']*1e3:.1f}ms", file=sys.stderr)
+        if paint['exceptions']:
+            failures.append(f"{args.script} raised {paint['exceptions']}")
+        if args.budget_first_paint is not None and paint['first_paint_seconds_min'] > args.budget_first_paint:
+            failures.append(f"first paint took {paint['first_paint_seconds_min']:.3f}s")
+    report['failures'] = failures
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+"""Timings, peak memory and chart payload sizes for the simulation, pricing and plotting hot paths.
+
+Run from the repo root with `python -m benchmarks.bench_suite`. Every case runs for each combination
+of --num-paths x --T x --n (cases that don't depend on n only run once per num_paths x T), without
+Streamlit. Each record has the best and median wall time, the peak traced memory of one run
+(NumPy allocations included) and, for chart cases, the size of the figure's JSON, which is what
+Streamlit ships to the browser.
+
+Results are written as JSON to --output (default stdout) together with the git commit and library
+versions, so two runs can be diffed: `--compare before.json` prints the new/old ratios per case.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import plotly
+
+from options_explainer.engine import (
+    call_payoff,
+    mc_estimate,
+    price_european_mc,
+    roll_dice_batch,
+    simulate_gbm_matrix,
+    simulate_gbm_terminal,
+    terminal_histogram,
+)
+from options_explainer.rendering import paths_histogram_figure, terminal_histogram_figure
+
+S0, MU, SIGMA, STRIKE = 200, 0.0, 0.005, 205
+# same cap the app uses before it switches to percentile bands
+MAX_PLOTTED_PATHS = 100
+
+
+def _paths(num_paths, T, n):
+    return simulate_gbm_matrix(S0, MU, SIGMA, n=n, T=T, num_paths=num_paths, seed=0)
+
+
+def _terminal(num_paths, T, n):
+    return simulate_gbm_terminal(S0, MU, SIGMA, T=T, num_paths=num_paths, seed=0)
+
+
+def _paths_chart(t, paths):
+    hist_values, bin_edges = terminal_histogram(paths[:, -1])
+    return paths_histogram_figure(t, paths, hist_values, bin_edges, strike_threshold=STRIKE, max_paths=MAX_PLOTTED_PATHS)
+
+
+def _terminal_chart(end_values):
+    hist_values, bin_edges = terminal_histogram(end_values)
+    return terminal_histogram_figure(hist_values, bin_edges, strike_threshold=STRIKE)
+
+
+# name -> (uses n, uses the full path matrix, setup(num_paths, T, n) -> args, run(*args)).
+# Only run is timed; when it returns a figure its JSON size is recorded.
+CASES = {
+    'gbm_paths': (True, True, lambda N, T, n: (N, T, n), _paths),
+    'gbm_terminal': (False, False, lambda N, T, n: (N, T, n), _terminal),
+    'call_price_mc': (False, False, lambda N, T, n: (_terminal(N, T, n),),
+                      lambda end_values: mc_estimate(call_payoff(end_values, STRIKE))),
+    'call_price_variance_reduced': (False, False, lambda N, T, n: (N, T),
+                                    lambda N, T: price_european_mc(S0, MU, SIGMA, T, STRIKE, num_paths=N, seed=0,
+                                                                   antithetic=True, control_variate='stock')),
+    'paths_histogram_figure': (True, True, _paths, _paths_chart),
+    'terminal_histogram_figure': (False, False, lambda N, T, n: (_terminal(N, T, n),), _terminal_chart),
+}
+
+
+def measure(run, args, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run(*args)
+        times.append(time.perf_counter() - start)
+    payload = len(result.to_json()) if hasattr(result, 'to_json') else None
+    del result
+
+    tracemalloc.start()
+    run(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return dict(seconds_min=min(times), seconds_median=float(np.median(times)), repeat=repeat, peak_bytes=peak,
+                payload_bytes=payload)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(num_paths_list, T_list, n_list, repeat, max_matrix_bytes, cases):
+    results = []
+    for case in cases:
+        uses_n, uses_matrix, setup, run = CASES[case]
+        for num_paths in num_paths_list:
+            for T in T_list:
+                for n in (n_list if uses_n else [None]):
+                    record = dict(case=case, num_paths=num_paths, T=T, n=n)
+                    matrix_bytes = num_paths*(n*T + 1)*8 if uses_matrix else 0
+                    if matrix_bytes > max_matrix_bytes:
+                        record['skipped'] = f'path matrix would be {matrix_bytes/1024**2:.0f} MiB'
+                    else:
+                        record.update(measure(run, setup(num_paths, T, n if uses_n else 1), repeat))
+                    results.append(record)
+                    print(_describe(record), file=sys.stderr)
+
+    rolls = 100_000
+    dice = dict(case='dice_rolls', num_paths=rolls, T=None, n=None)
+    dice.update(measure(lambda: np.bincount(roll_dice_batch(rolls, seed=0), minlength=7), (), repeat))
+    results.append(dice)
+    print(_describe(dice), file=sys.stderr)
+    return results
+
+
+def _describe(record):
+    key = f"{record['case']:<28} paths={record['num_paths']:<8} T={record['T']!s:<4} n={record['n']!s:<4}"
+    if 'skipped' in record:
+        return f"{key} skipped: {record['skipped']}"
+    payload = '' if record['payload_bytes'] is None else f" payload={record['payload_bytes']/1024:,.1f}KiB"
+    return f"{key} {record['seconds_min']*1e3:>10.2f}ms peak={record['peak_bytes']/1024**2:,.1f}MiB{payload}"
+
+
+def compare(results, baseline, file=sys.stdout):
+    def key(record):
+        return record['case'], record['num_paths'], record['T'], record['n']
+
+    before = {key(r): r for r in baseline['results'] if 'skipped' not in r}
+    print(f"compared with {baseline['meta'].get('commit')}", file=file)
+    print(f"{'case':<28} {'paths':>8} {'T':>4} {'n':>4} {'time':>8} {'memory':>8} {'payload':>8}", file=file)
+    for record in results:
+        old = before.get(key(record))
+        if old is None or 'skipped' in record:
+            continue
+        ratios = [record['seconds_min']/old['seconds_min'], record['peak_bytes']/max(old['peak_bytes'], 1)]
+        ratios.append(record['payload_bytes']/old['payload_bytes'] if record['payload_bytes'] and old['payload_bytes'] else None)
+        print(f"{record['case']:<28} {record['num_paths']:>8} {record['T']!s:>4} {record['n']!s:>4} "
+              + " ".join(f"{'-' if r is None else f'{r:.2f}x':>8}" for r in ratios), file=file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--num-paths', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--T', type=int, nargs='+', default=[30, 90])
+    parser.add_argument('--n', type=int, nargs='+', default=[1, 24])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--max-matrix-mib', type=float, default=512, help='skip full-path cases with a bigger path matrix')
+    parser.add_argument('--output', help='file to write the JSON results to (default: stdout)')
+    parser.add_argument('--compare', help='JSON results from an earlier run to compare against')
+    args = parser.parse_args()
+
+    results = run_suite(args.num_paths, args.T, args.n, args.repeat, args.max_matrix_mib*1024**2, args.cases)
+    report = dict(meta=dict(commit=git_commit(), timestamp=time.strftime('%Y-%m-%dT%H:%M:%S%z'), python=platform.python_version(),
+                            numpy=np.__version__, plotly=plotly.__version__, platform=platform.platform(), cpus=os.cpu_count()),
+                  results=results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            # keep stdout pure JSON when that's where the results went
+            compare(results, json.load(f), file=sys.stdout if args.output else sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,33 @@
+import os
+
 import streamlit as st
 import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from options_explainer.engine import Strategy, dice_call_distribution, dice_call_expected_value, dice_call_payoffs, dice_face_distribution, roll_dice_batch, simulation_cache
+from options_explainer.instrumentation import LOG_ENV, Profiler, profiling_requested
+from options_explainer.rendering import colored_bar_figure, line_figure, lines_figure
+from utils.util_functions import (
+    calculate_long_call_payoff,
+    calculate_long_put_payoff,
+    black_scholes_asset,
+    call_option_asset,
+    delta_hedging_asset,
+    exotic_options_asset,
+    page_section,
+    plot_chart,
+    profile_panel,
+    simulate_gbm_paths,
+    simulate_gbm_paths_plotly_histogram_with_bins,
+    simulate_gbm_paths_plotly_histogram_with_bins_and_color,
+    simulate_jump_paths,
+    simulate_stochastic_vol_paths,
+    streaming_call_asset,
+    variance_reduced_call_asset,
+)
+
+# opt-in rerun profiling: OPTIONS_EXPLAINER_PROFILE=1 or ?profile=1 adds a debug panel at the bottom
+profiler = Profiler(enabled=profiling_requested(st.query_params), log_path=os.environ.get(LOG_ENV), cache=simulation_cache).activate()
+profiler.section('intro')
 
 # Define the Streamlit app
 st.title("Options Explainer")
@@ -68,6 +93,7 @@ Notice that when the shoes are worth anything less than 200 dollars, we simply d
 """)
 
 
+profiler.section('call payoff')
 min_price_initial = 50
 max_price_initial = 400
 
@@ -76,20 +102,11 @@ premium_initial = 10
 
 underlying_prices_plot = np.linspace(min_price_initial, max_price_initial, 8)
 
-def calculate_long_call_payoff(underlying_prices, strike_price, premium):
-    payoffs = np.where(underlying_prices <= strike_price, -premium, (underlying_prices - strike_price) - premium)
-    return payoffs
-
 payoffs_plot = calculate_long_call_payoff(underlying_prices_plot, strike_price_initial, premium_initial)
 
-fig = px.line(x=underlying_prices_plot, y=payoffs_plot, labels={"x": "LeBron Shoe Value", "y": "Profit"})
-fig.update_layout(
-    title=f"Coupon Profit Diagram",
-    xaxis_title="LeBron Shoe Value",
-    yaxis_title="Profit"
-)
+fig = line_figure(underlying_prices_plot, payoffs_plot, "Coupon Profit Diagram", "LeBron Shoe Value", "Profit")
 
-st.plotly_chart(fig)
+plot_chart(fig)
 
 
 st.write("""
@@ -104,26 +121,27 @@ Play around with the parameters a bit, try to answer the following questions/do
 
 """)
 
-strike_price_input = st.slider(
-    'Select the discounted price to buy shoes at!',
-    0, 500, 200)
+@st.fragment
+def coupon_section():
+    # the two coupon sliders only redraw the chart right below them
+    with page_section('coupon sliders'):
+        strike_price_input = st.slider(
+            'Select the discounted price to buy shoes at!',
+            0, 500, 200)
 
-premium_input = st.slider(
-    'Select the price we paid for the coupon!',
-    0, 500, 10)
+        premium_input = st.slider(
+            'Select the price we paid for the coupon!',
+            0, 500, 10)
 
-underlying_prices_shoes = np.linspace(0, 500, (500))
+        underlying_prices_shoes = np.linspace(0, 500, (500))
 
-payoffs_shoes = calculate_long_call_payoff(underlying_prices_shoes, strike_price_input, premium_input)
+        payoffs_shoes = calculate_long_call_payoff(underlying_prices_shoes, strike_price_input, premium_input)
 
-fig2 = px.line(x=underlying_prices_shoes, y=payoffs_shoes, labels={"x": "LeBron Shoe Value", "y": "Profit"})
-fig2.update_layout(
-    title=f"Coupon Profit Diagram",
-    xaxis_title="LeBron Shoe Value",
-    yaxis_title="Profit"
-)
+        fig2 = line_figure(underlying_prices_shoes, payoffs_shoes, "Coupon Profit Diagram", "LeBron Shoe Value", "Profit")
 
-st.plotly_chart(fig2)
+        plot_chart(fig2)
+
+coupon_section()
 
 st.write("""
 
@@ -174,6 +192,7 @@ Notice again that when the handbag is worth anything more than 1500 dollars, we
 
 """)
 
+profiler.section('put payoff')
 min_price_bag = 100
 max_price_bag = 2000
 
@@ -182,20 +201,11 @@ premium_bag = 200
 
 underlying_prices_bag = np.linspace(min_price_bag, max_price_bag, max_price_bag-min_price_bag)
 
-def calculate_long_put_payoff(underlying_prices, strike_price, premium):
-    put_payoffs = np.where(underlying_prices <= strike_price, (strike_price - underlying_prices) - premium, -premium)
-    return put_payoffs
-
 payoffs_bag = calculate_long_put_payoff(underlying_prices_bag, strike_price_bag, premium_bag)
 
-fig_bag = px.line(x=underlying_prices_bag, y=payoffs_bag, labels={"x": "Designer Handbag Value", "y": "Profit"})
-fig_bag.update_layout(
-    title=f"Coworker Deal Profit Diagram",
-    xaxis_title="Designer Handbag Value",
-    yaxis_title="Profit"
-)
+fig_bag = line_figure(underlying_prices_bag, payoffs_bag, "Coworker Deal Profit Diagram", "Designer Handbag Value", "Profit")
 
-st.plotly_chart(fig_bag)
+plot_chart(fig_bag)
 
 st.write("""
 
@@ -271,83 +281,71 @@ Let's roll a dice 100,000 times, and plot a histogram of the rolls that we get
 
 
 
-def roll_dice():
-    return np.random.randint(1, 7)
-
-
-dice_strike = st.slider("Select the strike price of the option", 1, 6, 3)
-
-# Generate random dice rolls
-rolls = [roll_dice() for _ in range(100000)]
+@st.fragment
+def dice_section():
+    # the strike slider and the simulate/exact choice only feed the two dice charts and their average
+    with page_section('dice'):
+        dice_strike = st.slider("Select the strike price of the option", 1, 6, 3)
 
-hist, bin_edges = np.histogram(rolls, bins=6, range=(1, 7))
+        dice_mode = st.radio("Simulate the rolls, or work out the exact distribution? (a fair die makes every face equally likely)",
+                             ("Simulate 100,000 rolls", "Exact distribution"))
+        exact_dice = dice_mode == "Exact distribution"
+        num_rolls = 100000
 
-# Define colors based on bin values
-colors = ['green' if bin_value > dice_strike else 'red' for bin_value in bin_edges[0:]]
+        # Generate random dice rolls (or the counts we'd expect from a perfectly fair die)
+        if exact_dice:
+            faces, face_probabilities = dice_face_distribution()
+            hist = face_probabilities * num_rolls
+        else:
+            rolls = roll_dice_batch(num_rolls, seed=5)
+            hist = np.bincount(rolls, minlength=7)[1:]
+        bin_edges = np.arange(1, 8, dtype=float)
 
-# Create a bar chart using Plotly
-fig_dice = go.Figure()
-fig_dice.add_trace(go.Bar(
-    x=bin_edges[0:],
-    y=hist,
-    marker_color=colors,
-    text=hist,
-    textposition='outside'
-))
+        # Define colors based on bin values
+        colors = ['green' if bin_value > dice_strike else 'red' for bin_value in bin_edges[0:]]
 
-# Update the layout
-fig_dice.update_layout(
-    title=f"Dice Roll Histogram (Strike Price: {dice_strike})",
-    xaxis_title="Dice Value",
-    yaxis_title="Frequency"
-)
+        # Create a bar chart using Plotly
+        fig_dice = colored_bar_figure(bin_edges, hist, colors, f"Dice Roll Histogram (Strike Price: {dice_strike})",
+                                      "Dice Value", "Frequency")
 
-# Display the histogram
-st.plotly_chart(fig_dice)
+        # Display the histogram
+        plot_chart(fig_dice)
 
-st.write("""We'll also plot out the payoff, or profit, of having that option for each roll:
+        st.write("""We'll also plot out the payoff, or profit, of having that option for each roll:
 
 Red means the option ended up being worth 0 after the die roll, and green means it was worth a positive amount, denoted by the value at the bottom of the bar
 """)
 
-dice_payoffs = [roll-dice_strike if roll > dice_strike else 0 for roll in rolls]
-
-hist_payoffs, bin_edges_payoffs = np.histogram(dice_payoffs, bins=7-dice_strike, range=(0, 7-dice_strike))
+        if exact_dice:
+            payoff_values, payoff_probabilities = dice_call_distribution(dice_strike)
+            hist_payoffs = payoff_probabilities * num_rolls
+        else:
+            dice_payoffs = dice_call_payoffs(rolls, dice_strike)
+            hist_payoffs = np.bincount(dice_payoffs, minlength=7-dice_strike)
+        bin_edges_payoffs = np.arange(0, 8-dice_strike, dtype=float)
 
-# Define colors based on bin values
-colors_dice_payoffs = ['green' if bin_value > 0 else 'red' for bin_value in bin_edges_payoffs[0:]]
+        # Define colors based on bin values
+        colors_dice_payoffs = ['green' if bin_value > 0 else 'red' for bin_value in bin_edges_payoffs[0:]]
 
-# Create a bar chart using Plotly
-fig_dice_payoff = go.Figure()
-fig_dice_payoff.add_trace(go.Bar(
-    x=bin_edges_payoffs[0:],
-    y=hist_payoffs,
-    marker_color=colors_dice_payoffs,
-    text=hist_payoffs,
-    textposition='outside'
-))
-
-# Update the layout
-fig_dice_payoff.update_layout(
-    title=f"Dice Call Option Payoff Histogram (Strike Price: {dice_strike})",
-    xaxis_title="Option Payoff",
-    yaxis_title="Frequency"
-)
+        # Create a bar chart using Plotly
+        fig_dice_payoff = colored_bar_figure(bin_edges_payoffs, hist_payoffs, colors_dice_payoffs,
+                                             f"Dice Call Option Payoff Histogram (Strike Price: {dice_strike})",
+                                             "Option Payoff", "Frequency")
 
-st.plotly_chart(fig_dice_payoff)
+        plot_chart(fig_dice_payoff)
 
-probabilities = hist_payoffs / np.sum(hist_payoffs)
-expected_value = np.sum(probabilities * bin_edges_payoffs[:-1])
+        probabilities = payoff_probabilities if exact_dice else hist_payoffs / np.sum(hist_payoffs)
+        expected_value = np.sum(probabilities * bin_edges_payoffs[:-1])
 
-latex_string_dice = ""
+        latex_string_dice = ""
 
-for i in range(len(probabilities)):
-    if i == len(probabilities)-1:
-        latex_string_dice += f"{probabilities[i]} \\times {bin_edges_payoffs[i]} = {expected_value}"
-    else:
-        latex_string_dice += f"{probabilities[i]} \\times {bin_edges_payoffs[i]} + "
+        for i in range(len(probabilities)):
+            if i == len(probabilities)-1:
+                latex_string_dice += f"{probabilities[i]} \\times {bin_edges_payoffs[i]} = {expected_value}"
+            else:
+                latex_string_dice += f"{probabilities[i]} \\times {bin_edges_payoffs[i]} + "
         
-st.write("""
+        st.write("""
 Now we can calculate the average price of the option over the 100,000 rolls, and that should be pretty close to what the option is actually worth!
 
 We multiply each payoff by the probability of getting each of the payoffs, and add them all together, effectively a weighted average
@@ -355,12 +353,18 @@ We multiply each payoff by the probability of getting each of the payoffs, and a
 So for each outcome $i$
 """)
 
-st.latex('''
+        st.latex('''
 \\text{average value} = \\sum_i^n \\text{probability of outcome i} \\times \\text{payoff of outcome i}''')
 
-st.write(""" plugging in the values from the histogram above, we find that the strike selected's average value is: """)
+        st.write(""" plugging in the values from the histogram above, we find that the strike selected's average value is: """)
+
+        st.latex(latex_string_dice)
 
-st.latex(latex_string_dice)
+        if not exact_dice:
+            st.write(""" and working it out exactly from the six equally likely faces instead, the true average value is: """)
+            st.latex(dice_call_expected_value(dice_strike))
+
+dice_section()
 
 st.write("""
 
@@ -399,84 +403,15 @@ Here's how we're going to simulate a stock's potential future paths:
 There's some technical detail being glossed over in the above explanation, but feel free to look up geometric brownian motion if you want to learn more about the specifics!
 """)
 
-def simulate_gbm_paths(s0, mu, sigma, n=24, T=30, num_paths=1000, plot=True):
-    dt = 1/n
-    t = np.linspace(0, T, n*T+1)
-    S = np.zeros((num_paths, n*T+1))
-    
-    for i in range(num_paths):
-        W = np.random.standard_normal(size=n*T+1)
-        W = np.cumsum(W)*np.sqrt(dt)
-        X = (mu-0.5*sigma**2)*t + sigma*W
-        S[i,:] = s0*np.exp(X)
-        
-        
-    fig_paths = go.Figure()
-    for i in range(num_paths):
-        fig_paths.add_trace(go.Scatter(x=t, y=S[i,:], mode='lines', name=f'Path {i+1}'))
-
-    fig_paths.update_layout(
-        title='Simulated Stock Paths',
-        xaxis_title='Time',
-        yaxis_title='Price',
-        showlegend=True,
-        width=800,
-        height=500,
-    )
-    if plot:
-        st.plotly_chart(fig_paths)
-
-
-simulate_gbm_paths(s0=200, mu=0.0005, sigma=0.005, n=24, T=30, num_paths=10, plot=True)
+profiler.section('gbm demos')
+simulate_gbm_paths(s0=200, mu=0.0005, sigma=0.005, n=24, T=30, num_paths=10, plot=True, seed=0)
 
 st.write("""Now that we've simulated some paths, let's look at the distribution of outcomes these paths might create! 
 
-Let's generate a lot more paths: 100 should be a good number to start with
+Let's generate a lot more paths: 100 should be a good number to start with. To keep the chart readable it draws 20 of them, over shaded bands showing where the middle half and the middle 90% of all 100 paths went
 """)
 
-def simulate_gbm_paths_plotly_histogram_with_bins(s0, mu, sigma, n=24, T=30, num_paths=1000, num_bins=20):
-    dt = 1/n
-    t = np.linspace(0, T, n*T+1)
-    S = np.zeros((num_paths, n*T+1))
-    
-    for i in range(num_paths):
-        W = np.random.standard_normal(size=n*T+1)
-        W = np.cumsum(W)*np.sqrt(dt)
-        X = (mu-0.5*sigma**2)*t + sigma*W
-        S[i,:] = s0*np.exp(X)
-    
-    # Calculate end values
-    end_values = S[:, -1]
-    
-    # Calculate histogram data
-    hist_values, bin_edges = np.histogram(end_values, bins=num_bins)
-    
-    # Create subplots with one row and two columns
-    fig = make_subplots(rows=1, cols=2, subplot_titles=('Stock Paths', 'End Value Histogram'), column_widths=[0.7, 0.3])
-    
-    # Add GBM paths to the first subplot
-    for i in range(num_paths):
-        fig.add_trace(go.Scatter(x=t, y=S[i,:], mode='lines', name=f'Path {i+1}'), row=1, col=1)
-
-    
-    # Add a bar chart with bins and counts to the second subplot
-    fig.add_trace(go.Bar(y=bin_edges[:-1], x=hist_values, orientation='h', name='End Values'), row=1, col=2)
-    
-    # Update layout
-    fig.update_layout(
-        title='Simulated Stock Paths and Expiration Price Distribution',
-        xaxis_title='Counts',
-        yaxis_title='Price',
-        xaxis2=dict(domain=[0.75, 1.0]),
-        yaxis2=dict(anchor='x2'),
-        showlegend=False,  # Set to False to avoid legend duplication
-        width=1000,
-        height=500,
-    )
-    
-    st.plotly_chart(fig)
-
-simulate_gbm_paths_plotly_histogram_with_bins(s0=200, mu=0.0, sigma=0.005, n=24, T=30, num_paths=100)
+simulate_gbm_paths_plotly_histogram_with_bins(s0=200, mu=0.0, sigma=0.005, n=24, T=30, num_paths=100, seed=1)
 
 # Example usage:
 # simulate_gbm_paths_plotly_with_histogram(s0=100, mu=0.05, sigma=0.2, n=24, T=30, num_paths=5)
@@ -492,53 +427,7 @@ Let's do it again, and clearly mark the 'profitable' and 'unprofitable' zones: o
 
 For now, we'll set the strike price to be 205.""")
 
-def simulate_gbm_paths_plotly_histogram_with_bins_and_color(s0, mu, sigma, n=24, T=30, num_paths=1000, num_bins=20, strike_threshold=200):
-    dt = 1/n
-    t = np.linspace(0, T, n*T+1)
-    S = np.zeros((num_paths, n*T+1))
-    
-    for i in range(num_paths):
-        W = np.random.standard_normal(size=n*T+1)
-        W = np.cumsum(W)*np.sqrt(dt)
-        X = (mu-0.5*sigma**2)*t + sigma*W
-        S[i,:] = s0*np.exp(X)
-    
-    # Calculate end values
-    end_values = S[:, -1]
-    
-    # Calculate histogram data
-    hist_values, bin_edges = np.histogram(end_values, bins=num_bins)
-    
-    # Create subplots with one row and two columns
-    fig = make_subplots(rows=1, cols=2, subplot_titles=('Stock Paths', 'End Value Histogram'), column_widths=[0.7, 0.3])
-    
-    # Add GBM paths to the first subplot
-    for i in range(num_paths):
-        fig.add_trace(go.Scatter(x=t, y=S[i,:], mode='lines', name=f'Path {i+1}'), row=1, col=1)
-
-    colors_strike = ['red' if x < strike_threshold else 'green' for x in bin_edges[:-1]]
-    
-    # Add a bar chart with bins and counts to the second subplot
-    fig.add_trace(go.Bar(y=bin_edges[:-1], x=hist_values, orientation='h', marker_color=colors_strike, name='End Values'), row=1, col=2)
-    
-    # Update layout
-    fig.update_layout(
-        title='Simulated Stock Paths and Colored Expiration Price Distribution',
-        xaxis_title='Counts',
-        yaxis_title='Price',
-        xaxis2=dict(domain=[0.75, 1.0]),
-        yaxis2=dict(anchor='x2'),
-        showlegend=False,  # Set to False to avoid legend duplication
-        width=1000,
-        height=500,
-    )
-    
-    st.plotly_chart(fig)
-
-    return end_values, strike_threshold
-
-
-end_prices, strike_value = simulate_gbm_paths_plotly_histogram_with_bins_and_color(s0=200, mu=0.0, sigma=0.005, n=24, T=30, num_paths=100, strike_threshold=205)
+end_prices, strike_value = simulate_gbm_paths_plotly_histogram_with_bins_and_color(s0=200, mu=0.0, sigma=0.005, n=24, T=30, num_paths=100, strike_threshold=205, seed=2)
 
 st.write("""
 
@@ -546,13 +435,6 @@ st.write("""
 
 Let's not look at the calculation exactly here, since it would be a bit long, but according to the simulation, the price of the option is, on average: """)
 
-def call_option_asset(end_values, strike_value):
-    payoffs = end_values - strike_value
-    payoffs = np.clip(payoffs, 0, None)
-    st.latex("\\text{Simulated Fair Price: }")
-    st.latex(payoffs.mean())
-    return payoffs.mean()
-
 call_option_asset(end_prices, strike_value)
 
 st.write(""" 
@@ -580,43 +462,72 @@ What's the relation between the colors of the end value distribution and the opt
 
 """)
 
-st.write("""Current Price (what price is the stock at right now?)""")
+@st.fragment
+def interactive_pricer():
+    # every pricer below reads these four sliders, and nothing else on the page does
+    with page_section('interactive pricer'):
+        st.write("""Current Price (what price is the stock at right now?)""")
+
+        s0_input = st.slider(
+            'Select the price the stock is currently at!',
+            100, 1000, 200)
+
+
+        st.write("""Strike Value (what price do we get the option to buy the stock at?)""")
+
+        strike_val_input = st.slider(
+            'Select the strike price of the option!',
+            int(s0_input*0.8), int(s0_input*1.2), s0_input)
+
+        st.write("""Time to Expiry (how many days until the option expires?)""")
+
+        time_to_expiry_input = st.slider(
+            'Select the amount of days until the option expires!',
+            1, 90, 30)
+
+        # st.write("""Stock Drift (does it tend to go up or down?)""")
+        # mu_input = st.slider(
+        #     'Select how much the stock trends up or down!',
+        #     -25, 25, 5)
 
-s0_input = st.slider(
-    'Select the price the stock is currently at!',
-    100, 1000, 200)
+        st.write("""Stock Volatility (how wiggly are the price movements?)""")
 
+        sigma_input = st.slider(
+            'Select how volatile the stock is!',
+            0, 25, 5)
 
-st.write("""Strike Value (what price do we get the option to buy the stock at?)""")
+        end_prices_interactive, strike_val_input = simulate_gbm_paths_plotly_histogram_with_bins_and_color(s0=s0_input, 
+                                                                                                           mu=0.0, sigma=sigma_input/1e3, 
+                                                                                                           n=24, T=time_to_expiry_input, 
+                                                                                                           num_paths=200, 
+                                                                                                           strike_threshold=strike_val_input,
+                                                                                                           terminal_only=True,
+                                                                                                           seed=3)
 
-strike_val_input = st.slider(
-    'Select the strike price of the option!',
-    int(s0_input*0.8), int(s0_input*1.2), s0_input)
+        call_option_asset(end_prices_interactive, strike_val_input)
 
-st.write("""Time to Expiry (how many days until the option expires?)""")
+        st.write("""Notice how wide that confidence interval is with only 200 paths! We can do a lot better with the same number of paths using a couple of variance reduction tricks:
+- for every random path we draw, also use its mirror image (flip the sign of every random move), so the paths balance each other out
+- the stock's own average ending price is known exactly, so use how far the simulated stock's average ends up from it to correct the option's average""")
 
-time_to_expiry_input = st.slider(
-    'Select the amount of days until the option expires!',
-    1, 90, 30)
+        variance_reduced_call_asset(s0_input, 0.0, sigma_input/1e3, time_to_expiry_input, strike_val_input, num_paths=200, seed=4)
 
-# st.write("""Stock Drift (does it tend to go up or down?)""")
-# mu_input = st.slider(
-#     'Select how much the stock trends up or down!',
-#     -25, 25, 5)
+        st.write("""Or we can just keep simulating, a batch of paths at a time, until we're confident enough in the answer. Here we stop once the standard error is below 1 cent for every 200 dollars of stock price, or at a million paths. 
+Try a few settings and notice how many more paths the volatile, long-dated options need:""")
 
-st.write("""Stock Volatility (how wiggly are the price movements?)""")
+        streaming_call_asset(s0_input, 0.0, sigma_input/1e3, time_to_expiry_input, strike_val_input, seed=6)
 
-sigma_input = st.slider(
-    'Select how volatile the stock is!',
-    0, 25, 5)
+        st.write("""For comparison, here's what the Black-Scholes formula says the option is worth. It calculates the same average as the simulation, but exactly, 
+so the simulated price should land close to it. It also gives us the Greeks (Delta, Gamma, Vega, Theta and Rho) that we'll talk about below, per day of time to expiry:""")
 
-end_prices_interactive, strike_val_input = simulate_gbm_paths_plotly_histogram_with_bins_and_color(s0=s0_input, 
-                                                                                                   mu=0.0, sigma=sigma_input/1e3, 
-                                                                                                   n=24, T=time_to_expiry_input, 
-                                                                                                   num_paths=200, 
-                                                                                                   strike_threshold=strike_val_input)
+        black_scholes_asset(s0_input, strike_val_input, time_to_expiry_input, sigma_input/1e3)
 
-call_option_asset(end_prices_interactive, strike_val_input)
+        st.write("""So far only each path's last price has mattered. But we simulated every hour along the way, and some options care about the whole path. 
+Here are a few priced from the same kind of simulation (200 paths, with a price every 6 hours), using your settings above:""")
+
+        exotic_options_asset(s0_input, sigma_input/1e3, time_to_expiry_input, strike_val_input, barrier=int(s0_input*1.1), seed=8)
+
+interactive_pricer()
 
 st.write("""
 
@@ -683,6 +594,23 @@ Why might this be the case?
 
 The main reason is an increase in uncertainty around the value of Apple stock. We don’t know how people might react to the new iPhone, there might be product failures upon release, and other factors that could result in larger than average price movements.
 
+Our simulations so far kept the volatility fixed. Here are two ways to loosen that up. 
+The first adds sudden jumps, like a news announcement landing, about once every 20 days on average:
+
+""")
+
+profiler.section('volatility models')
+simulate_jump_paths(200, 0.0, 0.005, jump_intensity=0.05, jump_mean=0.0, jump_std=0.05, n=24, T=30, num_paths=100, seed=9)
+
+st.write("""
+The second lets the volatility itself wander over time, calming down and flaring up, and tending to rise when the stock falls:
+
+""")
+
+simulate_stochastic_vol_paths(200, 0.0, v0=0.005**2, kappa=0.1, theta=0.005**2, xi=0.0015, rho=-0.7, n=24, T=30, num_paths=100, seed=10)
+
+st.write("""
+
 While the market has an implied volatility that we can infer from the option's price, what actually happens might be different. 
 
 We call the volatility that actually happens 'realized volatility'. 
@@ -751,6 +679,22 @@ There's a lot of ways to express the above opinion, that Twitter will be exactly
 
 Think about why this might be the case!
 
+""")
+
+# both butterflies on one price grid: each is a single vectorized payoff over all three legs
+profiler.section('butterflies')
+underlying_prices_twitter = np.linspace(50, 58, 801)
+call_butterfly = Strategy.butterfly(54.2, 1.0, 'call')
+put_butterfly = Strategy.butterfly(54.2, 1.0, 'put')
+
+fig_butterfly = lines_figure(underlying_prices_twitter,
+                             {'Call butterfly': call_butterfly.payoff(underlying_prices_twitter),
+                              'Put butterfly': put_butterfly.payoff(underlying_prices_twitter)},
+                             "Butterflies Centered at 54.2 (Payoff at Expiry)", "Twitter Share Price", "Payoff")
+
+plot_chart(fig_butterfly)
+
+st.write("""
 #### What if I'm right about my trade on volatility, but wrong about the price movement? 
 
 Out of scope but here's a quick attempt at an explanation: 
@@ -773,6 +717,19 @@ So if your option has 0.5 delta, and moves 50 cents for every dollar movement in
 
 This means, in order to purely trade volatility, we can 'delta hedge' our risk due to the underlying stock's movement by buying shares (or selling them) 
 
+Here's what that looks like in a simulation. We buy a call at the money with 30 days to expiry, priced at a volatility of 10 (the same scale as the slider above), 
+and every hour we sell Delta shares of the stock against it. We run this on 1,000 paths where the stock's volatility really is 5, 10 and 15:
+
+""")
+
+profiler.section('delta hedging')
+delta_hedging_asset(200, 200, 0.01, [0.005, 0.01, 0.015], n=24, T=30, num_paths=1000, seed=7)
+
+st.write("""
+When the stock moves as much as the price implied, the hedged option makes about nothing, whichever way the stock went. 
+When it moves more we make money, and when it moves less we lose it: all that's left is the bet on volatility.
+
+
 ### What's Put Call Parity?
 
 Out of scope but here's a quick attempt at an explanation: 
@@ -781,6 +738,21 @@ Put Call Parity is basically just the realization that calls and puts are the tw
 
 By combining payoff diagrams, you might notice that being long a call and short a put is essentially just being long stock. 
 
+""")
+
+profiler.section('put call parity')
+underlying_prices_parity = np.linspace(100, 300, 201)
+call_minus_put = Strategy(['call', 'put'], [200, 200], [1, -1], 0.0)
+long_stock = Strategy(['stock'], [200], [1], 0.0)
+
+fig_parity = lines_figure(underlying_prices_parity,
+                          {'Long call + short put at 200': call_minus_put.payoff(underlying_prices_parity),
+                           'Stock bought at 200': long_stock.payoff(underlying_prices_parity)},
+                          "Put Call Parity (Payoff at Expiry)", "Stock Price", "Payoff")
+
+plot_chart(fig_parity)
+
+st.write("""
 Read more here: 
 
 ### What about volatility skew and term structure
@@ -832,3 +804,5 @@ https://x.com/therobotjames/status/1444832714922758148?s=20
 
 
 """)
+
+profile_panel(profiler)
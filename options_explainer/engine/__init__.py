@@ -0,0 +1,21 @@
+from .cache import SimulationCache, simulation_cache
+from .paths import SAMPLERS, GBMPaths, gbm_terminal_from_normals, path_quantiles, simulate_gbm, simulate_gbm_matrix, simulate_gbm_terminal, terminal_histogram
+from .payoffs import calculate_long_call_payoff, calculate_long_put_payoff, call_payoff, put_payoff
+from .pricing import MCEstimate, mc_estimate, price_call, price_european_mc, price_put
+from .black_scholes import BSGreeks, bs_delta, bs_greeks, bs_price
+from .implied_vol import ImpliedVolResult, implied_vol
+from .variance_reduction import antithetic_normals, control_variate_adjust, moment_match, pair_average
+from .qmc import brownian_bridge, sobol_normals
+from .streams import chunk_generators, make_rng, path_chunks, seed_sequences
+from .stats import Moments
+from .parallel import ChunkStats, ParallelResult, simulate_gbm_parallel
+from .streaming import StreamingResult, streaming_price, terminal_batches
+from .dice import DIE_FACES, dice_call_distribution, dice_call_expected_value, dice_call_payoffs, dice_face_distribution, roll_dice_batch
+from .histogram import RunningHistogram
+from .interpolation import multilinear_interpolate
+from .surface import PriceSurface, price_surface
+from .strategy import LEG_TYPES, Strategy
+from .hedging import HedgeResult, delta_hedge, realized_vol, realized_vs_implied
+from .exotics import AVERAGES, BARRIER_KINDS, asian_payoff, barrier_payoff, barrier_survival, lookback_payoff
+from .jump_diffusion import merton_price, simulate_merton, simulate_merton_matrix
+from .heston import heston_log_cf, heston_price, simulate_heston, simulate_heston_matrix
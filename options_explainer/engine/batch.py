@@ -0,0 +1,271 @@
+import csv
+import struct
+import time
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from .black_scholes import bs_price
+from .streams import make_rng
+
+# Batch pricing of European contracts from a file, outside the app:
+#     python -m options_explainer.engine.batch contracts.csv priced.parquet [--engine mc]
+# The input is read chunk_size contracts at a time, each chunk is priced in one vectorized call, and
+# its rows are appended to the output before the next chunk is read, so memory stays bounded
+# however long the file is.
+#
+# Contracts have spot, strike, expiry, vol and type ('call' or 'put'). As everywhere in the engine,
+# expiry, vol and the rate only need to share a time unit (the app's is days, vol per sqrt(day)).
+# Files are CSV (with a header row), .npy structured arrays, or Parquet when pyarrow is installed,
+# picked by extension. The output has the input columns plus price and std_error (0 for the
+# analytic engine).
+#
+# The mc engine is the app's simulated price (the mean of the discounted payoff over num_paths
+# terminal prices), for every contract at once. Each chunk draws from its own SeedSequence child,
+# so a seed reproduces the same prices for the same chunk_size.
+
+ENGINES = ('analytic', 'mc')
+CONTRACT_FIELDS = ('spot', 'strike', 'expiry', 'vol', 'type')
+OUTPUT_DTYPE = np.dtype([('spot', np.float64), ('strike', np.float64), ('expiry', np.float64), ('vol', np.float64),
+                         ('type', 'U4'), ('price', np.float64), ('std_error', np.float64)])
+# most normals the mc engine draws at once: 2**22 float64s is 32 MiB
+MAX_CELLS = 2**22
+
+
+def _is_call(types):
+    types = np.asarray(types)
+    if types.dtype == bool:
+        return types
+    types = np.char.lower(np.char.strip(types.astype(str)))
+    unknown = ~np.isin(types, ('call', 'put'))
+    if unknown.any():
+        raise ValueError(f"contract type must be 'call' or 'put', got {types[unknown][0]!r}")
+    return types == 'call'
+
+
+def _contracts(columns):
+    contracts = {field: np.asarray(columns[field], dtype=np.float64) for field in CONTRACT_FIELDS[:-1]}
+    contracts['is_call'] = _is_call(columns['type'])
+    return contracts
+
+
+def _pyarrow():
+    # pyarrow is only needed for Parquet, and only imported when a Parquet file is actually used
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError("Parquet files need pyarrow (pip install pyarrow)") from exc
+    return pyarrow
+
+
+def _read_csv(path, chunk_size):
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader)]
+        missing = set(CONTRACT_FIELDS) - set(header)
+        if missing:
+            raise ValueError(f"{path} is missing columns {sorted(missing)}")
+        index = [header.index(field) for field in CONTRACT_FIELDS]
+        while True:
+            rows = list(islice(reader, chunk_size))
+            if not rows:
+                return
+            # blank lines (a trailing newline, say) come back as empty rows
+            rows = [row for row in rows if row]
+            if not rows:
+                continue
+            columns = list(zip(*rows))
+            yield _contracts({field: columns[i] for field, i in zip(CONTRACT_FIELDS, index)})
+
+
+def _read_npy(path, chunk_size):
+    contracts = np.load(path, mmap_mode='r')
+    missing = set(CONTRACT_FIELDS) - set(contracts.dtype.names or ())
+    if missing:
+        raise ValueError(f"{path} is missing fields {sorted(missing)}")
+    for start in range(0, contracts.shape[0], chunk_size):
+        yield _contracts(contracts[start:start + chunk_size])
+
+
+def _read_parquet(path, chunk_size):
+    pyarrow = _pyarrow()
+    for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=list(CONTRACT_FIELDS)):
+        yield _contracts({field: batch.column(field).to_numpy(zero_copy_only=False) for field in CONTRACT_FIELDS})
+
+
+class _CsvWriter:
+
+    def __init__(self, path):
+        self.file = open(path, 'w')
+        self.file.write(','.join(OUTPUT_DTYPE.names) + '\n')
+
+    def write(self, rows):
+        np.savetxt(self.file, rows, fmt='%.17g,%.17g,%.17g,%.17g,%s,%.17g,%.17g')
+
+    def close(self):
+        self.file.close()
+
+
+class _NpyWriter:
+    # np.save needs the row count up front, so the header is written with room for any count and
+    # rewritten with the real one on close
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+        self.num_rows = 0
+        self.file.write(self._header(0))
+
+    @staticmethod
+    def _header(num_rows):
+        def describe(n):
+            return repr(dict(descr=np.lib.format.dtype_to_descr(OUTPUT_DTYPE), fortran_order=False, shape=(n,)))
+        # magic, version and length take 10 bytes; the header ends in a newline, and the whole is
+        # padded to a multiple of 64 as np.save does
+        size = -(-(10 + len(describe(2**64)) + 1)//64)*64
+        header = describe(num_rows).ljust(size - 11) + '\n'
+        return np.lib.format.MAGIC_PREFIX + bytes([1, 0]) + struct.pack('<H', len(header)) + header.encode('latin1')
+
+    def write(self, rows):
+        self.file.write(rows.tobytes())
+        self.num_rows += rows.shape[0]
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(self._header(self.num_rows))
+        self.file.close()
+
+
+class _ParquetWriter:
+
+    def __init__(self, path):
+        self.pyarrow = _pyarrow()
+        self.path = path
+        self.writer = None
+
+    def write(self, rows):
+        table = self.pyarrow.table({name: rows[name] for name in OUTPUT_DTYPE.names})
+        if self.writer is None:
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+_READERS = {'.csv': _read_csv, '.npy': _read_npy, '.parquet': _read_parquet}
+_WRITERS = {'.csv': _CsvWriter, '.npy': _NpyWriter, '.parquet': _ParquetWriter}
+
+
+def _by_suffix(path, table, kind):
+    suffix = Path(path).suffix.lower()
+    if suffix not in table:
+        raise ValueError(f"{kind} must be one of {sorted(table)}, got {path}")
+    return table[suffix]
+
+
+def read_contracts(path, chunk_size=50_000):
+    # yields dicts of spot, strike, expiry, vol and is_call arrays, at most chunk_size long
+    return _by_suffix(path, _READERS, 'contract files')(path, chunk_size)
+
+
+def price_contracts(spot, strike, expiry, vol, is_call=True, r=0.0, engine='analytic', num_paths=10_000, rng=None,
+                    seed=None, max_cells=MAX_CELLS):
+    # prices and standard errors for arrays of contracts. The mc engine simulates each contract's
+    # own num_paths terminal prices, max_cells normals at a time
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    spot, strike, expiry, vol, is_call = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (spot, strike, expiry, vol)),
+                                                             np.asarray(is_call, dtype=bool))
+    if engine == 'analytic':
+        return bs_price(spot, strike, expiry, vol, r, is_call), np.zeros(spot.shape)
+
+    rng = make_rng(seed=seed, rng=rng)
+    price, std_error = np.empty(spot.shape), np.empty(spot.shape)
+    rows = max(1, max_cells//num_paths)
+    for start in range(0, spot.shape[0], rows):
+        block = slice(start, start + rows)
+        T, sigma = expiry[block, None], vol[block, None]
+        values = rng.standard_normal((T.shape[0], num_paths))
+        values *= sigma*np.sqrt(T)
+        values += (r - 0.5*sigma**2)*T
+        np.exp(values, out=values)
+        values *= spot[block, None]
+        # payoffs in place: (S_T - K) for calls, (K - S_T) for puts, floored at 0 and discounted
+        values -= strike[block, None]
+        values *= np.where(is_call[block], 1.0, -1.0)[:, None]
+        np.maximum(values, 0, out=values)
+        values *= np.exp(-r*T)
+        price[block] = values.mean(axis=1)
+        std_error[block] = values.std(axis=1, ddof=1)/np.sqrt(num_paths) if num_paths > 1 else np.nan
+    return price, std_error
+
+
+@dataclass
+class BatchResult:
+    num_contracts: int
+    num_chunks: int
+    seconds: float
+
+    @property
+    def contracts_per_second(self):
+        return self.num_contracts/self.seconds if self.seconds > 0 else float('inf')
+
+
+def price_contract_file(input_path, output_path, engine='analytic', chunk_size=50_000, r=0.0, num_paths=10_000,
+                        seed=None, progress=None):
+    # streams input_path through price_contracts into output_path, calling progress(result) after
+    # every chunk with the totals so far
+    writer = _by_suffix(output_path, _WRITERS, 'output files')(output_path)
+    seed_seq = np.random.SeedSequence(seed)
+    result = BatchResult(num_contracts=0, num_chunks=0, seconds=0.0)
+    start = time.perf_counter()
+    try:
+        for contracts in read_contracts(input_path, chunk_size):
+            price, std_error = price_contracts(contracts['spot'], contracts['strike'], contracts['expiry'],
+                                               contracts['vol'], contracts['is_call'], r=r, engine=engine,
+                                               num_paths=num_paths, seed=seed_seq.spawn(1)[0])
+            rows = np.empty(price.shape[0], dtype=OUTPUT_DTYPE)
+            for field in CONTRACT_FIELDS[:-1]:
+                rows[field] = contracts[field]
+            rows['type'] = np.where(contracts['is_call'], 'call', 'put')
+            rows['price'], rows['std_error'] = price, std_error
+            writer.write(rows)
+
+            result.num_contracts += rows.shape[0]
+            result.num_chunks += 1
+            result.seconds = time.perf_counter() - start
+            if progress is not None:
+                progress(result)
+    finally:
+        writer.close()
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Price a file of European contracts (spot, strike, expiry, vol, type) "
+                                                 "in chunks, writing CSV, .npy or Parquet as it goes.")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--engine', default='analytic', choices=ENGINES)
+    parser.add_argument('--chunk-size', type=int, default=50_000)
+    parser.add_argument('--rate', type=float, default=0.0, help="risk-free rate, per unit of expiry")
+    parser.add_argument('--num-paths', type=int, default=10_000, help="paths per contract for the mc engine")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    def report(result):
+        print(f"{result.num_contracts:>12,} contracts  {result.contracts_per_second:>12,.0f}/s", file=sys.stderr)
+
+    result = price_contract_file(args.input, args.output, engine=args.engine, chunk_size=args.chunk_size, r=args.rate,
+                                 num_paths=args.num_paths, seed=args.seed, progress=report)
+    print(f"priced {result.num_contracts:,} contracts in {result.num_chunks} chunks, {result.seconds:.2f}s "
+          f"({result.contracts_per_second:,.0f} contracts/s) -> {args.output}")
+
@@ -0,0 +1,65 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ._normal import norm_cdf, norm_pdf
+
+# Analytic Black-Scholes prices and Greeks for European calls and puts.
+# Every argument broadcasts, so a strike x expiry grid is one call with K[:, None] and T[None, :].
+# T, sigma and r just need to share a time unit: the app works in days, with sigma per sqrt(day).
+
+
+@dataclass
+class BSGreeks:
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    vega: np.ndarray
+    theta: np.ndarray
+    rho: np.ndarray
+
+
+def _d1_d2(S, K, T, sigma, r):
+    S, K, T, sigma, r = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma, r)))
+    discounted_K = K * np.exp(-r*T)
+    vol = sigma * np.sqrt(T)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = np.log(S/discounted_K)/vol + 0.5*vol
+    # at expiry or zero vol the option is worth its (discounted) intrinsic value, which is
+    # what d1 = d2 = +/-inf gives (and d1 = d2 = 0 exactly at the money)
+    degenerate = vol <= 0
+    d1 = np.where(degenerate, np.where(S > discounted_K, np.inf, np.where(S < discounted_K, -np.inf, 0.0)), d1)
+    d2 = np.where(degenerate, d1, d1 - vol)
+    return S, K, T, sigma, r, discounted_K, vol, d1, d2
+
+
+def bs_price(S, K, T, sigma, r=0.0, is_call=True):
+    S, K, T, sigma, r, discounted_K, vol, d1, d2 = _d1_d2(S, K, T, sigma, r)
+    call = S*norm_cdf(d1) - discounted_K*norm_cdf(d2)
+    put = discounted_K*norm_cdf(-d2) - S*norm_cdf(-d1)
+    return np.where(is_call, call, put)
+
+
+def bs_delta(S, K, T, sigma, r=0.0, is_call=True):
+    # just the delta, for callers (like a hedging loop) that need it many times over
+    d1 = _d1_d2(S, K, T, sigma, r)[7]
+    return np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1)
+
+
+def bs_greeks(S, K, T, sigma, r=0.0, is_call=True):
+    S, K, T, sigma, r, discounted_K, vol, d1, d2 = _d1_d2(S, K, T, sigma, r)
+    is_call = np.broadcast_to(is_call, S.shape)
+    pdf_d1 = norm_pdf(d1)
+    cdf_d1, cdf_d2 = norm_cdf(d1), norm_cdf(d2)
+    cdf_neg_d1, cdf_neg_d2 = norm_cdf(-d1), norm_cdf(-d2)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = np.where(vol > 0, pdf_d1/(S*vol), 0.0)
+        decay = np.where(T > 0, -S*pdf_d1*sigma/(2*np.sqrt(T)), 0.0)
+
+    price = np.where(is_call, S*cdf_d1 - discounted_K*cdf_d2, discounted_K*cdf_neg_d2 - S*cdf_neg_d1)
+    delta = np.where(is_call, cdf_d1, cdf_d1 - 1)
+    vega = S*pdf_d1*np.sqrt(T)
+    theta = np.where(is_call, decay - r*discounted_K*cdf_d2, decay + r*discounted_K*cdf_neg_d2)
+    rho = np.where(is_call, T*discounted_K*cdf_d2, -T*discounted_K*cdf_neg_d2)
+    return BSGreeks(price=price, delta=delta, gamma=gamma, vega=vega, theta=theta, rho=rho)
@@ -0,0 +1,139 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .hedging import HedgeResult, delta_hedge
+from .heston import simulate_heston
+from .jump_diffusion import simulate_merton
+from .paths import GBMPaths, simulate_gbm, simulate_gbm_terminal
+
+
+def _freeze(array):
+    # cached arrays are shared between callers, so nobody gets to write into them
+    array.flags.writeable = False
+    return array
+
+
+def _nbytes(value):
+    if isinstance(value, GBMPaths):
+        return value.t.nbytes + value.paths.nbytes
+    if isinstance(value, HedgeResult):
+        return value.pnl.nbytes + value.option_pnl.nbytes + value.hedge_pnl.nbytes + value.realized_vol.nbytes
+    return value.nbytes
+
+
+class SimulationCache:
+    # LRU over simulation results, evicting by total array bytes rather than entry count.
+    # Only seeded calls are cached: with seed=None every call is meant to be a fresh draw.
+
+    def __init__(self, max_bytes=256 * 1024**2):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return dict(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                        entries=len(self._entries), nbytes=self._nbytes, max_bytes=self.max_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # compute outside the lock so one slow simulation doesn't block every other lookup
+        value = compute()
+        size = _nbytes(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = value
+                self._nbytes += size
+                while self._nbytes > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._nbytes -= _nbytes(evicted)
+                    self.evictions += 1
+            return self._entries[key]
+
+    def simulate_gbm(self, s0, mu, sigma, n=24, T=30, num_paths=1000, seed=None, dtype=np.float64):
+        dtype = np.dtype(dtype)
+        return self._paths(('gbm', s0, mu, sigma, n, T, num_paths, seed, dtype.str),
+                           lambda: simulate_gbm(s0, mu, sigma, n=n, T=T, num_paths=num_paths, seed=seed, dtype=dtype), seed)
+
+    def simulate_gbm_terminal(self, s0, mu, sigma, T=30, num_paths=1000, seed=None, dtype=np.float64):
+        dtype = np.dtype(dtype)
+
+        def compute():
+            return _freeze(simulate_gbm_terminal(s0, mu, sigma, T=T, num_paths=num_paths, seed=seed, dtype=dtype))
+
+        if seed is None:
+            with self._lock:
+                self.misses += 1
+            return compute()
+        return self.get_or_compute(('gbm_terminal', s0, mu, sigma, T, num_paths, seed, dtype.str), compute)
+
+    def _paths(self, key, simulate, seed):
+        # any simulation returning GBMPaths: frozen, and cached under key when seeded
+        def compute():
+            sim = simulate()
+            _freeze(sim.t)
+            _freeze(sim.paths)
+            return sim
+
+        if seed is None:
+            with self._lock:
+                self.misses += 1
+            return compute()
+        return self.get_or_compute(key, compute)
+
+    def simulate_merton(self, s0, mu, sigma, jump_intensity, jump_mean, jump_std, n=24, T=30, num_paths=1000, seed=None):
+        return self._paths(('merton', s0, mu, sigma, jump_intensity, jump_mean, jump_std, n, T, num_paths, seed),
+                           lambda: simulate_merton(s0, mu, sigma, jump_intensity, jump_mean, jump_std, n=n, T=T,
+                                                   num_paths=num_paths, seed=seed), seed)
+
+    def simulate_heston(self, s0, mu, v0, kappa, theta, xi, rho, n=24, T=30, num_paths=1000, seed=None):
+        return self._paths(('heston', s0, mu, v0, kappa, theta, xi, rho, n, T, num_paths, seed),
+                           lambda: simulate_heston(s0, mu, v0, kappa, theta, xi, rho, n=n, T=T, num_paths=num_paths,
+                                                   seed=seed), seed)
+
+    def delta_hedge(self, s0, mu, sigma, strike_value, implied_vol, n=24, T=30, num_paths=1000, seed=None, **hedge_kwargs):
+        # the hedge along this cache's simulate_gbm paths. Rebalancing steps through every path at
+        # every step, which costs far more than the simulation, so seeded results are kept too
+        def compute():
+            sim = self.simulate_gbm(s0, mu, sigma, n=n, T=T, num_paths=num_paths, seed=seed)
+            result = delta_hedge(sim.t, sim.paths, strike_value, implied_vol, **hedge_kwargs)
+            for array in (result.pnl, result.option_pnl, result.hedge_pnl, result.realized_vol):
+                _freeze(array)
+            return result
+
+        if seed is None:
+            with self._lock:
+                self.misses += 1
+            return compute()
+        return self.get_or_compute(('delta_hedge', s0, mu, sigma, strike_value, implied_vol, n, T, num_paths, seed,
+                                    tuple(sorted(hedge_kwargs.items()))), compute)
+
+
+simulation_cache = SimulationCache()
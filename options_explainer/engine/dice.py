@@ -0,0 +1,33 @@
+import numpy as np
+
+from .streams import make_rng
+
+DIE_FACES = np.arange(1, 7)
+
+
+def roll_dice_batch(num_rolls, seed=None, rng=None):
+    return make_rng(seed=seed, rng=rng).integers(1, 7, size=num_rolls)
+
+
+def dice_call_payoffs(rolls, strike):
+    return np.maximum(rolls - strike, 0)
+
+
+def dice_face_distribution():
+    return DIE_FACES, np.full(len(DIE_FACES), 1/len(DIE_FACES))
+
+
+def dice_call_distribution(strike):
+    # every payoff value from 0 up to the best face, with its exact probability under a fair die.
+    # Faces are whole numbers, so the payoff values are only evenly spaced for a whole-number strike
+    if strike != int(strike):
+        raise ValueError(f"strike must be a whole number, got {strike!r}")
+    payoffs = dice_call_payoffs(DIE_FACES, strike)
+    values = np.arange(0, max(int(DIE_FACES[-1] - strike), 0) + 1)
+    probabilities = np.bincount(payoffs.astype(np.int64), minlength=len(values))/len(DIE_FACES)
+    return values, probabilities
+
+
+def dice_call_expected_value(strike):
+    values, probabilities = dice_call_distribution(strike)
+    return float(np.sum(values*probabilities))
@@ -0,0 +1,68 @@
+import numpy as np
+
+from .payoffs import call_payoff, put_payoff
+
+# Payoffs of path-dependent options, reduced along the time axis of a (num_paths, steps) path
+# matrix like the ones simulate_gbm_matrix returns. Column 0 is today's price, so averages and
+# extremes are taken over the monitoring dates in columns 1 onwards.
+
+AVERAGES = ('arithmetic', 'geometric')
+BARRIER_KINDS = ('up-and-out', 'up-and-in', 'down-and-out', 'down-and-in')
+
+
+def _vanilla(end_values, strike_value, is_call):
+    return call_payoff(end_values, strike_value) if is_call else put_payoff(end_values, strike_value)
+
+
+def asian_payoff(paths, strike_value, is_call=True, average='arithmetic'):
+    monitored = paths[:, 1:]
+    if average == 'arithmetic':
+        mean = monitored.mean(axis=1, dtype=np.float64)
+    elif average == 'geometric':
+        mean = np.exp(np.log(monitored).mean(axis=1, dtype=np.float64))
+    else:
+        raise ValueError(f"average must be one of {AVERAGES}, got {average!r}")
+    return _vanilla(mean, strike_value, is_call)
+
+
+def lookback_payoff(paths, strike_value=None, is_call=True):
+    # strike_value=None is the floating-strike lookback: buy at the low (call) or sell at the high (put)
+    end_values = paths[:, -1].astype(np.float64)
+    low = paths[:, 1:].min(axis=1).astype(np.float64)
+    high = paths[:, 1:].max(axis=1).astype(np.float64)
+    if strike_value is None:
+        return end_values - low if is_call else high - end_values
+    return call_payoff(high, strike_value) if is_call else put_payoff(low, strike_value)
+
+
+def barrier_survival(t, paths, barrier, direction='up', sigma=None):
+    # probability, per path, that the barrier was never touched. Without sigma that only checks the
+    # simulated steps. With it, each step also gets the Brownian-bridge chance of having crossed
+    # in between, exp(-2*a*b/(sigma**2*dt)) for log-distances a, b to the barrier at either end,
+    # which removes the bias from monitoring a continuous barrier only at discrete steps
+    if direction not in ('up', 'down'):
+        raise ValueError(f"direction must be 'up' or 'down', got {direction!r}")
+    with np.errstate(divide='ignore'):
+        distance = np.log(barrier/paths) if direction == 'up' else np.log(paths/barrier)
+    # a touched barrier has distance 0, which gives a crossing probability of 1 below
+    np.maximum(distance, 0, out=distance)
+    if not sigma:
+        return np.all(distance > 0, axis=1).astype(np.float64)
+    dt = np.diff(np.asarray(t, dtype=np.float64))
+    with np.errstate(divide='ignore'):
+        log_survival = np.log1p(-np.exp(-2*distance[:, :-1]*distance[:, 1:]/(sigma*sigma*dt)))
+    return np.exp(log_survival.sum(axis=1, dtype=np.float64))
+
+
+def barrier_payoff(t, paths, strike_value, barrier, kind='up-and-out', is_call=True, sigma=None, rebate=0.0):
+    # expected payoff given each simulated path: with sigma, knock-outs are weighted by the bridge
+    # survival probability rather than all-or-nothing. The rebate is paid at expiry to a knocked-out
+    # option, or to a knock-in that never knocked in
+    if kind not in BARRIER_KINDS:
+        raise ValueError(f"kind must be one of {BARRIER_KINDS}, got {kind!r}")
+    direction, knock = kind.split('-and-')
+    survival = barrier_survival(t, paths, barrier, direction, sigma)
+    vanilla = _vanilla(paths[:, -1].astype(np.float64), strike_value, is_call)
+    if knock == 'out':
+        return survival*vanilla + (1 - survival)*rebate
+    return (1 - survival)*vanilla + survival*rebate
@@ -0,0 +1,96 @@
+import numpy as np
+
+from .paths import GBMPaths, _output_buffer
+from .streams import chunk_generators, path_chunks
+
+# Heston stochastic volatility: the variance v mean-reverts to theta at rate kappa with vol of vol
+# xi, and its shocks are correlated rho with the stock's. All rates are per unit of t, so in the
+# app's days v is a variance per day (sigma**2 in the GBM engine's units).
+#
+# Paths use full-truncation Euler on log S: max(v, 0) wherever v feeds the drift or a diffusion
+# term, while v itself can go negative and come back. It is biased by O(dt) but at n = 24 steps a
+# day that is well under the Monte Carlo error, and unlike GBM it has to step through time, so the
+# loop is over steps with every path advanced at once. heston_price is the semi-closed form to
+# check it against.
+
+
+def _fill_heston_block(out, variance, s0, mu, v0, kappa, theta, xi, rho, dt, rng):
+    dtype = out.dtype
+    num_paths = out.shape[0]
+    log_s = np.zeros(num_paths)
+    v = np.full(num_paths, float(v0))
+    out[:, 0] = 0
+    if variance is not None:
+        variance[:, 0] = v0
+    rho_c = np.sqrt(1 - rho*rho)
+    for i in range(1, out.shape[1]):
+        z = rng.standard_normal((2, num_paths))
+        v_pos = np.maximum(v, 0)
+        vol = np.sqrt(v_pos*dt)
+        log_s += (mu - 0.5*v_pos)*dt + vol*z[0]
+        v += kappa*(theta - v_pos)*dt + xi*vol*(rho*z[0] + rho_c*z[1])
+        out[:, i] = log_s
+        if variance is not None:
+            variance[:, i] = np.maximum(v, 0)
+    np.exp(out, out=out)
+    out *= dtype.type(s0)
+
+
+def simulate_heston_matrix(s0, mu, v0, kappa, theta, xi, rho, n=24, T=30, num_paths=1000, rng=None, dtype=np.float64,
+                           out=None, seed=None, chunk_size=None, return_variance=False):
+    # same layout, buffers and chunked streams as simulate_gbm_matrix; with return_variance the
+    # (truncated) variance paths come back as a third array
+    dtype, out = _output_buffer((num_paths, n*T+1), dtype, out)
+    variance = np.empty_like(out) if return_variance else None
+
+    dt = 1/n
+    t = np.linspace(0, T, n*T+1, dtype=dtype)
+
+    chunks = path_chunks(num_paths, chunk_size)
+    for (start, stop), chunk_rng in zip(chunks, chunk_generators(len(chunks), seed=seed, rng=rng)):
+        _fill_heston_block(out[start:stop], None if variance is None else variance[start:stop], s0, mu, v0, kappa, theta,
+                           xi, rho, dt, chunk_rng)
+    return (t, out, variance) if return_variance else (t, out)
+
+
+def simulate_heston(s0, mu, v0, kappa, theta, xi, rho, n=24, T=30, num_paths=1000, rng=None, dtype=np.float64, out=None,
+                    seed=None, chunk_size=None):
+    t, S = simulate_heston_matrix(s0, mu, v0, kappa, theta, xi, rho, n=n, T=T, num_paths=num_paths, rng=rng, dtype=dtype,
+                                  out=out, seed=seed, chunk_size=chunk_size)
+    return GBMPaths(t=t, paths=S)
+
+
+def heston_log_cf(u, T, v0, kappa, theta, xi, rho, r=0.0):
+    # characteristic function of log(S_T/S_0), in the form that stays on the right branch of the
+    # complex log for long expiries (Albrecher et al., "The little Heston trap")
+    iu = 1j*u
+    beta = kappa - rho*xi*iu
+    d = np.sqrt(beta*beta + xi*xi*(iu + u*u))
+    g = (beta - d)/(beta + d)
+    decay = np.exp(-d*T)
+    C = r*iu*T + kappa*theta/(xi*xi)*((beta - d)*T - 2*np.log((1 - g*decay)/(1 - g)))
+    D = (beta - d)/(xi*xi)*(1 - decay)/(1 - g*decay)
+    return np.exp(C + D*v0)
+
+
+def heston_price(S, K, T, v0, kappa, theta, xi, rho, r=0.0, is_call=True, num_nodes=256):
+    # Gil-Pelaez: P(S_T > K) under the stock and money-market measures, each one integral of the
+    # characteristic function, done with Gauss-Legendre on [0, u_max]. The integrands decay like
+    # exp(-u**2 * total variance / 2), so u_max is set from the larger of v0 and theta
+    S, K = np.broadcast_arrays(np.asarray(S, dtype=np.float64), np.asarray(K, dtype=np.float64))
+    total_variance = max(v0, theta)*T
+    u_max = 40/np.sqrt(total_variance)
+    nodes, weights = np.polynomial.legendre.leggauss(num_nodes)
+    u = 0.5*u_max*(nodes + 1)
+    weights = 0.5*u_max*weights
+
+    log_moneyness = np.log(K/S)[..., None]
+    forward_cf = heston_log_cf(u - 1j, T, v0, kappa, theta, xi, rho, r)/np.exp(r*T)
+    cf = heston_log_cf(u, T, v0, kappa, theta, xi, rho, r)
+    oscillation = np.exp(-1j*u*log_moneyness)
+    p1 = 0.5 + (np.real(oscillation*forward_cf/(1j*u)) @ weights)/np.pi
+    p2 = 0.5 + (np.real(oscillation*cf/(1j*u)) @ weights)/np.pi
+
+    discounted_K = K*np.exp(-r*T)
+    call = S*p1 - discounted_K*p2
+    return np.where(is_call, call, call - S + discounted_K)
@@ -0,0 +1,176 @@
+import numpy as np
+
+# Constant-size histogram for terminal prices that are seen in batches.
+#
+# Adaptive mode (no bin_edges) puts bins on a fixed lattice in log-price: bin j covers
+# [exp(j*w), exp((j+1)*w)) with w = resolution * 2**level. Only num_bins consecutive lattice bins
+# are kept; when a batch doesn't fit, adjacent pairs are merged (level goes up, bins double in
+# width) until it does. Two histograms built with the same resolution always line up after
+# coarsening to the larger level, so merging across workers is exact. Quantiles read off this
+# lattice have a relative error of at most about w/2, the same guarantee as a DDSketch.
+#
+# Fixed mode (bin_edges given) just counts into those bins, tracking anything outside them.
+
+
+class RunningHistogram:
+
+    def __init__(self, bin_edges=None, num_bins=64, resolution=1e-4):
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.underflow = 0
+        self.overflow = 0
+        if bin_edges is not None:
+            self._edges = np.asarray(bin_edges, dtype=np.float64)
+            if self._edges.ndim != 1 or len(self._edges) < 2 or np.any(np.diff(self._edges) <= 0):
+                raise ValueError("bin_edges must be a strictly increasing 1-d array with at least two edges")
+            self.counts = np.zeros(len(self._edges) - 1, dtype=np.int64)
+            self.adaptive = False
+        else:
+            if num_bins < 2 or num_bins % 2:
+                raise ValueError(f"num_bins must be an even number >= 2, got {num_bins}")
+            self._edges = None
+            self.counts = np.zeros(num_bins, dtype=np.int64)
+            self.resolution = resolution
+            self.level = 0
+            self.offset = None
+            self.adaptive = True
+
+    @property
+    def num_bins(self):
+        return len(self.counts)
+
+    @property
+    def bin_width(self):
+        return self.resolution * 2.0**self.level
+
+    @property
+    def bin_edges(self):
+        if not self.adaptive:
+            return self._edges
+        offset = 0 if self.offset is None else self.offset
+        return np.exp((offset + np.arange(self.num_bins + 1)) * self.bin_width)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size == 0:
+            return self
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if not self.adaptive:
+            idx = np.searchsorted(self._edges, values, side='right') - 1
+            # the last edge is inclusive, like np.histogram
+            idx[values == self._edges[-1]] = self.num_bins - 1
+            inside = (idx >= 0) & (idx < self.num_bins)
+            self.underflow += int(np.count_nonzero(values < self._edges[0]))
+            self.overflow += int(np.count_nonzero(values > self._edges[-1]))
+            self.counts += np.bincount(idx[inside], minlength=self.num_bins)
+            return self
+
+        positive = values > 0
+        # prices can't be <= 0, but count rather than drop anything that is
+        self.underflow += int(values.size - np.count_nonzero(positive))
+        idx = np.floor(np.log(values[positive]) / self.bin_width).astype(np.int64)
+        if idx.size:
+            idx >>= self._fit(int(idx.min()), int(idx.max()))
+            self.counts += np.bincount(idx - self.offset, minlength=self.num_bins)
+        return self
+
+    def merge(self, other):
+        if self.adaptive:
+            merged = RunningHistogram(num_bins=self.num_bins, resolution=self.resolution)
+        else:
+            merged = RunningHistogram(bin_edges=self._edges)
+        merged._absorb(self)
+        merged._absorb(other)
+        return merged
+
+    def _absorb(self, other):
+        if self.adaptive != other.adaptive or self.num_bins != other.num_bins:
+            raise ValueError("can only merge histograms of the same kind and size")
+        if not self.adaptive and not np.array_equal(self._edges, other._edges):
+            raise ValueError("fixed-bin histograms need identical bin_edges to merge")
+        if self.adaptive and self.resolution != other.resolution:
+            raise ValueError("adaptive histograms need the same resolution to merge")
+
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+        if not self.adaptive:
+            self.counts += other.counts
+            return
+        occupied = np.flatnonzero(other.counts)
+        if occupied.size == 0:
+            return
+        if self.offset is None:
+            self.level = max(self.level, other.level)
+        elif self.level < other.level:
+            self._coarsen(other.level - self.level)
+        # other's occupied bins on the lattice at this histogram's level
+        lattice = (other.offset + occupied) >> max(self.level - other.level, 0)
+        lattice >>= self._fit(int(lattice.min()), int(lattice.max()))
+        np.add.at(self.counts, lattice - self.offset, other.counts[occupied])
+
+    def _fit(self, lo, hi):
+        # grows the window to hold lattice bins lo..hi (given at the current level) along with
+        # everything already counted, coarsening as needed; returns how many levels it coarsened
+        # so the caller can shift its own indices to match
+        if self.offset is not None:
+            occupied = np.flatnonzero(self.counts)
+            if occupied.size:
+                lo = min(lo, self.offset + int(occupied[0]))
+                hi = max(hi, self.offset + int(occupied[-1]))
+        levels = 0
+        while (hi >> levels) - (lo >> levels) + 1 > self.num_bins:
+            levels += 1
+        if self.offset is None:
+            self.level += levels
+            self.offset = lo >> levels
+            return levels
+        if levels:
+            self._coarsen(levels)
+        lo, hi = lo >> levels, hi >> levels
+        if lo < self.offset or hi >= self.offset + self.num_bins:
+            self._shift(lo)
+        return levels
+
+    def _coarsen(self, levels):
+        lattice = (self.offset + np.arange(self.num_bins)) >> levels
+        offset = self.offset >> levels
+        counts = np.zeros(self.num_bins, dtype=np.int64)
+        np.add.at(counts, lattice - offset, self.counts)
+        self.counts = counts
+        self.offset = offset
+        self.level += levels
+
+    def _shift(self, new_offset):
+        occupied = np.flatnonzero(self.counts)
+        counts = np.zeros(self.num_bins, dtype=np.int64)
+        counts[occupied + self.offset - new_offset] = self.counts[occupied]
+        self.counts = counts
+        self.offset = new_offset
+
+    def occupied(self):
+        # counts and edges trimmed to the bins that have anything in them, for plotting
+        nonzero = np.flatnonzero(self.counts)
+        if nonzero.size == 0:
+            return self.counts[:0], self.bin_edges[:1]
+        first, last = int(nonzero[0]), int(nonzero[-1])
+        return self.counts[first:last + 1], self.bin_edges[first:last + 2]
+
+    def quantile(self, q):
+        # linear interpolation of the cdf inside each bin (geometric for adaptive log bins)
+        q = np.asarray(q, dtype=np.float64)
+        in_bins = self.counts.sum()
+        if in_bins == 0:
+            return np.full(q.shape, np.nan)
+        cdf = np.concatenate([[0], np.cumsum(self.counts)]) / in_bins
+        edges = self.bin_edges
+        if self.adaptive:
+            result = np.exp(np.interp(q, cdf, np.log(edges)))
+        else:
+            result = np.interp(q, cdf, edges)
+        return np.clip(result, self.min, self.max)
@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ._normal import norm_cdf, norm_pdf
+
+# Backs Black-Scholes volatility out of whole chains of quotes at once.
+# Works in total vol v = sigma*sqrt(T), where the call price is monotone in v and bounded by
+# (S - K*exp(-rT))+ and S: Newton steps from a Corrado-Miller guess, falling back to bisection
+# whenever a step leaves the current bracket. Only still-active quotes are touched per iteration.
+# Deep in/out of the money quotes with next to no vega only pin the vol down loosely; they
+# converge on a collapsed bracket rather than on the price tolerance.
+
+
+@dataclass
+class ImpliedVolResult:
+    sigma: np.ndarray
+    converged: np.ndarray
+    iterations: np.ndarray
+
+
+def _call_price_and_vega(S, discounted_K, v):
+    d1 = np.log(S/discounted_K)/v + 0.5*v
+    price = S*norm_cdf(d1) - discounted_K*norm_cdf(d1 - v)
+    return price, S*norm_pdf(d1)
+
+
+def _initial_guess(c, S, discounted_K):
+    # Corrado-Miller approximation, clipped to something positive when its discriminant goes negative
+    half_moneyness = 0.5*(S - discounted_K)
+    disc = np.maximum((c - half_moneyness)**2 - (S - discounted_K)**2/np.pi, 0.0)
+    v = np.sqrt(2*np.pi)/(S + discounted_K) * (c - half_moneyness + np.sqrt(disc))
+    return np.where(v > 1e-8, v, np.sqrt(2*np.abs(np.log(S/discounted_K))) + 1e-4)
+
+
+def implied_vol(price, S, K, T, r=0.0, is_call=True, tol=1e-10, max_iter=100):
+    price, S, K, T, r, is_call = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (price, S, K, T, r)),
+                                                     np.asarray(is_call, dtype=bool))
+    shape = price.shape
+    price, S, K, T, r, is_call = (x.ravel() for x in (price, S, K, T, r, is_call))
+
+    discounted_K = K*np.exp(-r*T)
+    # puts are solved as calls through put-call parity
+    c = np.where(is_call, price, price + S - discounted_K)
+
+    v = np.full(c.shape, np.nan)
+    converged = np.zeros(c.shape, dtype=bool)
+    iterations = np.zeros(c.shape, dtype=np.int64)
+
+    # quotes outside the no-arbitrage bounds have no implied vol
+    lower = np.maximum(S - discounted_K, 0.0)
+    valid = (T > 0) & (S > 0) & (K > 0) & (c > lower) & (c < S)
+    idx = np.flatnonzero(valid)
+    if idx.size == 0:
+        return ImpliedVolResult(sigma=v.reshape(shape), converged=converged.reshape(shape), iterations=iterations.reshape(shape))
+
+    target, s, dk = c[idx], S[idx], discounted_K[idx]
+    x = _initial_guess(target, s, dk)
+    lo = np.zeros_like(x)
+    hi = np.maximum(2*x, 1.0)
+    # grow the upper end of the bracket until it prices above the quote
+    for _ in range(64):
+        high_price, _ = _call_price_and_vega(s, dk, hi)
+        short = high_price < target
+        if not short.any():
+            break
+        hi = np.where(short, 2*hi, hi)
+    x = np.clip(x, lo, hi)
+
+    for _ in range(max_iter):
+        iterations[idx] += 1
+        model, vega = _call_price_and_vega(s, dk, x)
+        diff = model - target
+        hi = np.where(diff > 0, x, hi)
+        lo = np.where(diff < 0, x, lo)
+
+        # a bracket that has shrunk to nothing is as converged as the price tolerance allows
+        done = (np.abs(diff) <= tol) | (hi - lo <= 1e-15*np.maximum(hi, 1.0))
+        converged[idx[done]] = True
+        v[idx] = x
+
+        keep = ~done
+        if not keep.any():
+            break
+        idx, target, s, dk, x, lo, hi, diff, vega = (a[keep] for a in (idx, target, s, dk, x, lo, hi, diff, vega))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = x - diff/vega
+        x = np.where((newton > lo) & (newton < hi), newton, 0.5*(lo + hi))
+
+    return ImpliedVolResult(sigma=(v/np.sqrt(T)).reshape(shape), converged=converged.reshape(shape),
+                            iterations=iterations.reshape(shape))
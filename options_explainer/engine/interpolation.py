@@ -0,0 +1,35 @@
+import numpy as np
+
+
+def multilinear_interpolate(axes, values, points):
+    # values has one axis per entry in `axes` (each strictly increasing), plus optional trailing
+    # axes carried along; points is (..., len(axes)). Queries outside the grid are clamped to it.
+    values = np.asarray(values)
+    points = np.asarray(points, dtype=np.float64)
+    batch_shape = points.shape[:-1]
+    points = points.reshape(-1, len(axes))
+
+    lower, weights = [], []
+    for d, axis in enumerate(axes):
+        axis = np.asarray(axis, dtype=np.float64)
+        if len(axis) == 1:
+            lower.append(np.zeros(len(points), dtype=np.int64))
+            weights.append(np.zeros(len(points)))
+            continue
+        x = np.clip(points[:, d], axis[0], axis[-1])
+        i = np.clip(np.searchsorted(axis, x, side='right') - 1, 0, len(axis) - 2)
+        lower.append(i)
+        weights.append((x - axis[i])/(axis[i+1] - axis[i]))
+
+    result = 0.0
+    # sum over the 2**ndim corners of each query's cell
+    for corner in range(2**len(axes)):
+        index, weight = [], np.ones(len(points))
+        for d in range(len(axes)):
+            upper = (corner >> d) & 1
+            size = len(axes[d])
+            index.append(np.minimum(lower[d] + upper, size - 1))
+            weight = weight*(weights[d] if upper else 1 - weights[d])
+        corner_values = values[tuple(index)]
+        result = result + weight.reshape((-1,) + (1,)*(corner_values.ndim - 1))*corner_values
+    return np.asarray(result).reshape(batch_shape + values.shape[len(axes):])
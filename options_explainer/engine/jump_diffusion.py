@@ -0,0 +1,77 @@
+from math import factorial
+
+import numpy as np
+
+from .black_scholes import bs_price
+from .paths import GBMPaths, _output_buffer
+from .streams import chunk_generators, path_chunks
+
+# Merton jump-diffusion: GBM plus jumps arriving at rate jump_intensity (per unit of t), each
+# multiplying the price by exp(N(jump_mean, jump_std**2)). The drift is compensated so E[S_t] is
+# still s0*exp(mu*t), which keeps it comparable with the GBM engine at the same mu.
+#
+# Jumps are rare, so rather than a Poisson draw for every (path, step) cell, each block draws its
+# total number of jumps and scatters them over uniformly chosen cells. By Poisson splitting that
+# gives every cell an independent Poisson(jump_intensity*dt) count, at a cost that grows with the
+# number of jumps instead of the size of the matrix.
+
+
+def _compensator(jump_mean, jump_std):
+    # E[exp(J)] - 1, the mean relative jump size
+    return np.exp(jump_mean + 0.5*jump_std**2) - 1
+
+
+def _fill_merton_block(out, t, s0, mu, sigma, jump_intensity, jump_mean, jump_std, dt, rng):
+    dtype = out.dtype
+    rng.standard_normal(dtype=dtype, out=out)
+    out[:, 0] = 0
+    out *= dtype.type(sigma*np.sqrt(dt))
+
+    # jumps land in columns 1 onwards, the steps that have an increment
+    num_cells = out.shape[0]*(out.shape[1] - 1)
+    num_jumps = rng.poisson(jump_intensity*dt*num_cells)
+    cells = rng.integers(0, num_cells, size=num_jumps)
+    rows, cols = np.divmod(cells, out.shape[1] - 1)
+    np.add.at(out, (rows, cols + 1), rng.normal(jump_mean, jump_std, size=num_jumps).astype(dtype))
+
+    np.cumsum(out, axis=1, out=out)
+    out += dtype.type(mu - 0.5*sigma**2 - jump_intensity*_compensator(jump_mean, jump_std))*t
+    np.exp(out, out=out)
+    out *= dtype.type(s0)
+
+
+def simulate_merton_matrix(s0, mu, sigma, jump_intensity, jump_mean, jump_std, n=24, T=30, num_paths=1000, rng=None,
+                           dtype=np.float64, out=None, seed=None, chunk_size=None):
+    # same layout, buffers and chunked streams as simulate_gbm_matrix
+    dtype, out = _output_buffer((num_paths, n*T+1), dtype, out)
+
+    dt = 1/n
+    t = np.linspace(0, T, n*T+1, dtype=dtype)
+
+    chunks = path_chunks(num_paths, chunk_size)
+    for (start, stop), chunk_rng in zip(chunks, chunk_generators(len(chunks), seed=seed, rng=rng)):
+        _fill_merton_block(out[start:stop], t, s0, mu, sigma, jump_intensity, jump_mean, jump_std, dt, chunk_rng)
+    return t, out
+
+
+def simulate_merton(s0, mu, sigma, jump_intensity, jump_mean, jump_std, n=24, T=30, num_paths=1000, rng=None,
+                    dtype=np.float64, out=None, seed=None, chunk_size=None):
+    t, S = simulate_merton_matrix(s0, mu, sigma, jump_intensity, jump_mean, jump_std, n=n, T=T, num_paths=num_paths,
+                                  rng=rng, dtype=dtype, out=out, seed=seed, chunk_size=chunk_size)
+    return GBMPaths(t=t, paths=S)
+
+
+def merton_price(S, K, T, sigma, jump_intensity, jump_mean, jump_std, r=0.0, is_call=True, num_terms=60):
+    # Merton's series: Black-Scholes prices conditioned on the number of jumps, each with the drift and
+    # vol that k jumps imply, weighted by a Poisson(jump_intensity*(1 + kappa)*T) probability
+    T = np.asarray(T, dtype=np.float64)
+    kappa = _compensator(jump_mean, jump_std)
+    intensity = jump_intensity*(1 + kappa)
+    price = 0.0
+    for k in range(num_terms):
+        weight = np.exp(-intensity*T)*(intensity*T)**k/factorial(k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sigma_k = np.sqrt(sigma**2 + k*jump_std**2/T)
+            r_k = r - jump_intensity*kappa + k*(jump_mean + 0.5*jump_std**2)/T
+        price = price + weight*bs_price(S, K, T, sigma_k, r_k, is_call)
+    return price
@@ -0,0 +1,174 @@
+import functools
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .black_scholes import BSGreeks, bs_greeks
+from .interpolation import multilinear_interpolate
+from .surface import price_surface
+
+# Precomputed Black-Scholes call table over the app's slider domain (r = 0, days, sigma per sqrt(day)).
+#
+# With r = 0 the price is homogeneous in (S, K), so the table only needs moneyness m = K/S:
+# price, vega, theta and rho scale with S, delta doesn't, gamma scales with 1/S. Expiries and vols
+# sit on the slider's integer steps (1..90 days, sigma 0..0.025 by 0.001), so slider queries only
+# ever interpolate along m, linearly between nodes h = MONEYNESS_STEP apart. Puts come from parity.
+#
+# Error bound for the price: linear interpolation is off by at most h**2/8 * max|d2C/dK2| * S**2,
+# and d2C/dK2 = n(d2)/(K*w) with w = sigma*sqrt(T), so
+#     |error| <= S * h**2 / (8*sqrt(2*pi)*m*w)
+# which is never more than S*h/4 (the bound for any payoff whose slope moves by at most 1 in a cell).
+# At w = 0 the kink sits on the m = 1 node and the error is zero. That only bounds interpolation
+# along m, so price_error_bound() is infinite for queries between expiry or vol nodes, and
+# greeks(..., tol=...) reprices exactly wherever the bound exceeds tol. The Greeks are
+# interpolated the same way; max_errors() measures everything at the cell midpoints. With tol =
+# 5e-6*S (half a cent at S = 1000) the measured Greek errors are below 5e-2 for gamma (S = 1) and
+# 1e-2 for the rest.
+#
+# This is the analytic surface by default, which is no faster than evaluating bs_greeks directly;
+# the table earns its keep when it is filled from a pricer without a closed form (backend='mc').
+
+FIELDS = ('price', 'delta', 'gamma', 'vega', 'theta', 'rho')
+MONEYNESS_RANGE = (0.8, 1.2)
+MONEYNESS_STEP = 1e-3
+EXPIRIES = np.arange(1, 91, dtype=np.float64)
+VOLS = np.arange(26, dtype=np.float64)/1e3
+
+# in the user's cache directory, not the installed package
+DEFAULT_PATH = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'options_explainer' / 'bs_lookup.npy'
+
+
+def moneyness_axis():
+    lo, hi = MONEYNESS_RANGE
+    return np.linspace(lo, hi, int(round((hi - lo)/MONEYNESS_STEP)) + 1)
+
+
+def lookup_shape():
+    return (len(EXPIRIES), len(VOLS), len(moneyness_axis()), len(FIELDS))
+
+
+def _on_node(x, axis):
+    # whether each x sits on one of the (sorted) axis nodes
+    i = np.clip(np.searchsorted(axis, x), 1, len(axis) - 1)
+    nearest = np.minimum(np.abs(x - axis[i - 1]), np.abs(x - axis[i]))
+    return nearest <= 1e-9*max(np.abs(axis).max(), 1.0)
+
+
+def build_lookup_values(expiries=EXPIRIES, vols=VOLS, moneyness=None, backend='analytic', **surface_kwargs):
+    # (expiry, vol, moneyness, field) so a query's neighbouring nodes are next to each other on disk.
+    # backend and surface_kwargs go to price_surface, so the mc backend can fill a table the same way
+    moneyness = moneyness_axis() if moneyness is None else moneyness
+    surface = price_surface(1.0, moneyness, expiries, vols, backend=backend, **surface_kwargs)
+    return np.stack([getattr(surface, f).transpose(1, 2, 0) for f in FIELDS], axis=-1).astype(np.float32)
+
+
+class LookupTable:
+
+    def __init__(self, values, expiries=EXPIRIES, vols=VOLS, moneyness=None):
+        self.values = values
+        self.expiries = np.asarray(expiries, dtype=np.float64)
+        self.vols = np.asarray(vols, dtype=np.float64)
+        self.moneyness = moneyness_axis() if moneyness is None else np.asarray(moneyness, dtype=np.float64)
+        expected = (len(self.expiries), len(self.vols), len(self.moneyness), len(FIELDS))
+        if values.shape != expected:
+            raise ValueError(f"lookup values have shape {values.shape}, expected {expected}")
+
+    @property
+    def moneyness_step(self):
+        return float(self.moneyness[1] - self.moneyness[0])
+
+    def covers(self, S, K, T, sigma):
+        m = np.asarray(K)/np.asarray(S)
+        return ((m >= self.moneyness[0]) & (m <= self.moneyness[-1]) & (T >= self.expiries[0]) & (T <= self.expiries[-1])
+                & (sigma >= self.vols[0]) & (sigma <= self.vols[-1]))
+
+    def price_error_bound(self, S, K, T, sigma):
+        S, K, T, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma)))
+        h, m, w = self.moneyness_step, K/S, sigma*np.sqrt(T)
+        with np.errstate(divide='ignore'):
+            bound = np.minimum(S*h*h/(8*np.sqrt(2*np.pi)*m*w), S*h/4)
+        # plus float32 rounding of the stored values, which are below 1 for S = 1
+        bound = bound + S*np.finfo(np.float32).eps
+        on_node = np.isclose((m - self.moneyness[0])/h, np.round((m - self.moneyness[0])/h), rtol=0, atol=1e-9)
+        bound = np.where((w == 0) & on_node, S*np.finfo(np.float32).eps, bound)
+        return np.where(_on_node(T, self.expiries) & _on_node(sigma, self.vols), bound, np.inf)
+
+    def greeks(self, S, K, T, sigma, is_call=True, tol=None):
+        # anything outside the table, or whose price_error_bound is over tol, is computed exactly
+        S, K, T, sigma = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (S, K, T, sigma)))
+        points = np.stack([T, sigma, K/S], axis=-1)
+        table = multilinear_interpolate((self.expiries, self.vols, self.moneyness), self.values, points)
+        fields = {f: table[..., i].astype(np.float64) for i, f in enumerate(FIELDS)}
+        for f in ('price', 'vega', 'theta', 'rho'):
+            fields[f] = fields[f]*S
+        fields['gamma'] = fields['gamma']/S
+        if not is_call:
+            fields['price'] = fields['price'] - S + K
+            fields['delta'] = fields['delta'] - 1
+            fields['rho'] = fields['rho'] - T*K
+        # arithmetic on 0-d arrays gives NumPy scalars, which the exact values can't be assigned into
+        fields = {f: np.array(value, dtype=np.float64) for f, value in fields.items()}
+
+        exact = ~self.covers(S, K, T, sigma)
+        if tol is not None:
+            exact |= self.price_error_bound(S, K, T, sigma) > tol
+        if np.any(exact):
+            greeks = bs_greeks(S[exact], K[exact], T[exact], sigma[exact], is_call=is_call)
+            for f in FIELDS:
+                fields[f][exact] = getattr(greeks, f)
+        return BSGreeks(**fields)
+
+    def max_errors(self, tol=None):
+        # largest absolute error per field (for S = 1) at the cell midpoints along m, against bs_greeks,
+        # for what greeks(..., tol=tol) would return
+        midpoints = 0.5*(self.moneyness[1:] + self.moneyness[:-1])
+        grid = (1.0, midpoints[None, None, :], self.expiries[:, None, None], self.vols[None, :, None])
+        table, exact = self.greeks(*grid, tol=tol), bs_greeks(*grid)
+        return {f: float(np.max(np.abs(getattr(table, f) - getattr(exact, f)))) for f in FIELDS}
+
+
+def save_lookup_table(path=DEFAULT_PATH, **build_kwargs):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    np.save(path, build_lookup_values(**build_kwargs))
+    return path
+
+
+def load_lookup_table(path=DEFAULT_PATH, build=True):
+    # memory-mapped, so only the pages a query touches are ever read. A missing table (or one
+    # written for a different grid) is built and saved when build is set, and kept in memory if
+    # the path isn't writable
+    path = Path(path)
+    if path.exists():
+        values = np.load(path, mmap_mode='r')
+        if values.shape == lookup_shape():
+            return LookupTable(values)
+        del values
+    if not build:
+        return None
+    try:
+        values = np.load(save_lookup_table(path), mmap_mode='r')
+    except OSError:
+        values = build_lookup_values()
+    return LookupTable(values)
+
+
+@functools.lru_cache(maxsize=None)
+def default_lookup_table():
+    return load_lookup_table()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the Black-Scholes lookup table and report its interpolation error.")
+    parser.add_argument('path', nargs='?', default=DEFAULT_PATH)
+    parser.add_argument('--backend', default='analytic')
+    parser.add_argument('--tol', type=float, default=None, help="price error bound (for S = 1) above which to reprice exactly")
+    args = parser.parse_args()
+    table = LookupTable(np.load(save_lookup_table(args.path, backend=args.backend), mmap_mode='r'))
+    print(f"wrote {args.path} ({table.values.nbytes/1024**2:.1f} MiB)")
+    for field, error in table.max_errors(tol=args.tol).items():
+        print(f"{field:>6} max error at cell midpoints (S=1): {error:.3e}")
+
@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from .histogram import RunningHistogram
+from .paths import _check_sampler, _fill_gbm_block, _fill_terminal_block
+from .payoffs import call_payoff, put_payoff
+from .stats import Moments
+from .streams import path_chunks, seed_sequences
+
+# Multi-core GBM simulation for runs too big to hold as one path matrix. num_paths is split into
+# chunks, each simulated from its own spawned stream (same mapping as simulate_gbm_matrix with
+# seed/chunk_size), and every worker only sends back a few numbers per chunk: moments of S_T and
+# of the payoff, plus a constant-size RunningHistogram. Chunks are reduced in order, so the
+# result doesn't depend on how many workers ran them. NumPy releases the GIL in the heavy loops,
+# so the thread backend scales too and avoids pickling/process start-up.
+
+BACKENDS = ('serial', 'thread', 'process')
+
+
+@dataclass
+class ChunkStats:
+    terminal: Moments
+    payoff: Moments
+    histogram: RunningHistogram
+
+    def merge(self, other):
+        return ChunkStats(terminal=self.terminal.merge(other.terminal), payoff=self.payoff.merge(other.payoff),
+                          histogram=self.histogram.merge(other.histogram))
+
+
+@dataclass
+class ParallelResult:
+    terminal: Moments
+    payoff: Moments
+    histogram: RunningHistogram
+    num_chunks: int
+
+    def price(self, confidence=0.95):
+        return self.payoff.estimate(confidence=confidence)
+
+
+def _new_histogram(bin_edges, num_bins):
+    return RunningHistogram(num_bins=num_bins) if bin_edges is None else RunningHistogram(bin_edges=bin_edges)
+
+
+def _simulate_chunk(s0, mu, sigma, n, T, num_rows, seed_seq, dtype, sampler, terminal_only, strike_value, is_call, bin_edges, num_bins):
+    rng = np.random.default_rng(seed_seq)
+    if terminal_only:
+        end_values = np.empty(num_rows, dtype=dtype)
+        _fill_terminal_block(end_values, s0, mu, sigma, T, rng, sampler)
+    else:
+        block = np.empty((num_rows, n*T+1), dtype=dtype)
+        t = np.linspace(0, T, n*T+1, dtype=dtype)
+        _fill_gbm_block(block, t, s0, mu, sigma, 1/n, rng, sampler)
+        end_values = block[:, -1].copy()
+        del block
+
+    payoff = Moments()
+    if strike_value is not None:
+        payoffs = call_payoff(end_values, strike_value) if is_call else put_payoff(end_values, strike_value)
+        payoff = Moments.from_samples(payoffs)
+    return ChunkStats(terminal=Moments.from_samples(end_values), payoff=payoff,
+                      histogram=_new_histogram(bin_edges, num_bins).update(end_values))
+
+
+def _run_chunk(args):
+    return _simulate_chunk(*args)
+
+
+def simulate_gbm_parallel(s0, mu, sigma, n=24, T=30, num_paths=1_000_000, seed=None, chunk_size=50_000, workers=None,
+                          backend='thread', strike_value=None, is_call=True, bin_edges=None, num_bins=64, terminal_only=False,
+                          dtype=np.float64, sampler='pseudo'):
+    # bin_edges fixes the histogram bins; without them every chunk uses the adaptive log lattice
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    _check_sampler(sampler)
+    dtype = np.dtype(dtype)
+
+    chunks = path_chunks(num_paths, chunk_size)
+    jobs = [(s0, mu, sigma, n, T, stop - start, seed_seq, dtype, sampler, terminal_only, strike_value, is_call, bin_edges, num_bins)
+            for (start, stop), seed_seq in zip(chunks, seed_sequences(seed, len(chunks)))]
+
+    if backend == 'serial' or workers == 1:
+        total = _reduce(map(_run_chunk, jobs), _new_histogram(bin_edges, num_bins))
+    else:
+        workers = workers or os.cpu_count() or 1
+        executor_cls = ThreadPoolExecutor if backend == 'thread' else ProcessPoolExecutor
+        with executor_cls(max_workers=workers) as executor:
+            total = _reduce(executor.map(_run_chunk, jobs), _new_histogram(bin_edges, num_bins))
+
+    return ParallelResult(terminal=total.terminal, payoff=total.payoff, histogram=total.histogram, num_chunks=len(chunks))
+
+
+def _reduce(results, empty_histogram):
+    total = ChunkStats(terminal=Moments(), payoff=Moments(), histogram=empty_histogram)
+    for chunk_stats in results:
+        total = total.merge(chunk_stats)
+    return total
@@ -0,0 +1,118 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .histogram import RunningHistogram
+from .qmc import brownian_bridge, sobol_normals
+from .streams import chunk_generators, path_chunks
+
+# 'pseudo' draws iid normals from the Generator, 'sobol' uses scrambled Sobol points
+# (seeded from the Generator) with a Brownian bridge for multi-step paths
+SAMPLERS = ('pseudo', 'sobol')
+
+
+@dataclass
+class GBMPaths:
+    t: np.ndarray
+    paths: np.ndarray
+
+    @property
+    def terminal(self):
+        return self.paths[:, -1]
+
+
+def _output_buffer(shape, dtype, out):
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"dtype must be float32 or float64, got {dtype}")
+    if out is None:
+        out = np.empty(shape, dtype=dtype)
+    elif out.shape != shape or out.dtype != dtype:
+        raise ValueError(f"out must have shape {shape} and dtype {dtype}, got {out.shape} and {out.dtype}")
+    return dtype, out
+
+
+def _check_sampler(sampler):
+    if sampler not in SAMPLERS:
+        raise ValueError(f"sampler must be one of {SAMPLERS}, got {sampler!r}")
+
+
+def _fill_gbm_block(out, t, s0, mu, sigma, dt, rng, sampler):
+    dtype = out.dtype
+    if sampler == 'sobol':
+        brownian_bridge(sobol_normals(out.shape[0], out.shape[1]-1, rng).astype(dtype, copy=False), dt, out=out)
+        out *= dtype.type(sigma)
+    else:
+        # paths start at s0, so the first column gets no increment
+        rng.standard_normal(dtype=dtype, out=out)
+        out[:, 0] = 0
+        np.cumsum(out, axis=1, out=out)
+        out *= dtype.type(sigma*np.sqrt(dt))
+    out += dtype.type(mu-0.5*sigma**2)*t
+    np.exp(out, out=out)
+    out *= dtype.type(s0)
+
+
+def _fill_terminal_block(out, s0, mu, sigma, T, rng, sampler):
+    if sampler == 'sobol':
+        out[:] = sobol_normals(out.shape[0], 1, rng)[:, 0]
+    else:
+        rng.standard_normal(dtype=out.dtype, out=out)
+    gbm_terminal_from_normals(s0, mu, sigma, T, out, out=out)
+
+
+def simulate_gbm_matrix(s0, mu, sigma, n=24, T=30, num_paths=1000, rng=None, dtype=np.float64, out=None, sampler='pseudo',
+                        seed=None, chunk_size=None):
+    # all paths in one batched draw + cumsum, written into `out` when given so callers can reuse the buffer.
+    # With chunk_size, each block of rows is drawn from its own stream spawned from seed (or rng).
+    _check_sampler(sampler)
+    dtype, out = _output_buffer((num_paths, n*T+1), dtype, out)
+
+    dt = 1/n
+    t = np.linspace(0, T, n*T+1, dtype=dtype)
+
+    chunks = path_chunks(num_paths, chunk_size)
+    for (start, stop), chunk_rng in zip(chunks, chunk_generators(len(chunks), seed=seed, rng=rng)):
+        _fill_gbm_block(out[start:stop], t, s0, mu, sigma, dt, chunk_rng, sampler)
+    return t, out
+
+
+def simulate_gbm(s0, mu, sigma, n=24, T=30, num_paths=1000, rng=None, dtype=np.float64, out=None, sampler='pseudo',
+                 seed=None, chunk_size=None):
+    t, S = simulate_gbm_matrix(s0, mu, sigma, n=n, T=T, num_paths=num_paths, rng=rng, dtype=dtype, out=out, sampler=sampler,
+                               seed=seed, chunk_size=chunk_size)
+    return GBMPaths(t=t, paths=S)
+
+
+def simulate_gbm_terminal(s0, mu, sigma, T=30, num_paths=1000, rng=None, dtype=np.float64, out=None, sampler='pseudo',
+                          seed=None, chunk_size=None):
+    # S_T is lognormal under GBM, so payoffs that only look at expiry need one normal per path, not n*T+1
+    _check_sampler(sampler)
+    dtype, out = _output_buffer((num_paths,), dtype, out)
+
+    chunks = path_chunks(num_paths, chunk_size)
+    for (start, stop), chunk_rng in zip(chunks, chunk_generators(len(chunks), seed=seed, rng=rng)):
+        _fill_terminal_block(out[start:stop], s0, mu, sigma, T, chunk_rng, sampler)
+    return out
+
+
+def gbm_terminal_from_normals(s0, mu, sigma, T, z, out=None):
+    # maps standard normals to S_T, so samplers that shape their own normals (antithetic,
+    # moment matched, quasi-random) share the same transform
+    z = np.asarray(z)
+    dtype = z.dtype if z.dtype in (np.float32, np.float64) else np.dtype(np.float64)
+    out = np.multiply(z, dtype.type(sigma*np.sqrt(T)), out=out, dtype=dtype)
+    out += dtype.type((mu-0.5*sigma**2)*T)
+    np.exp(out, out=out)
+    out *= dtype.type(s0)
+    return out
+
+
+def terminal_histogram(end_values, num_bins=20):
+    # log-spaced bins on the RunningHistogram lattice, trimmed to the occupied range
+    return RunningHistogram(num_bins=num_bins).update(end_values).occupied()
+
+
+def path_quantiles(paths, quantiles=(5, 25, 50, 75, 95)):
+    # one row per quantile, computed across all paths at every timestep
+    return np.percentile(paths, quantiles, axis=0)
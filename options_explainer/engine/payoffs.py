@@ -0,0 +1,19 @@
+import numpy as np
+
+
+def calculate_long_call_payoff(underlying_prices, strike_price, premium):
+    payoffs = np.where(underlying_prices <= strike_price, -premium, (underlying_prices - strike_price) - premium)
+    return payoffs
+
+
+def calculate_long_put_payoff(underlying_prices, strike_price, premium):
+    put_payoffs = np.where(underlying_prices <= strike_price, (strike_price - underlying_prices) - premium, -premium)
+    return put_payoffs
+
+
+def call_payoff(end_values, strike_value):
+    return np.clip(end_values - strike_value, 0, None)
+
+
+def put_payoff(end_values, strike_value):
+    return np.clip(strike_value - end_values, 0, None)
@@ -0,0 +1,71 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ._normal import norm_ppf
+from .paths import SAMPLERS, gbm_terminal_from_normals
+from .payoffs import call_payoff, put_payoff
+from .qmc import sobol_normals
+from .streams import make_rng
+from .variance_reduction import antithetic_normals, control_variate_adjust, moment_match, pair_average
+
+
+@dataclass
+class MCEstimate:
+    price: float
+    std_error: float
+    ci_low: float
+    ci_high: float
+    num_samples: int
+
+
+def price_call(end_values, strike_value):
+    return float(call_payoff(end_values, strike_value).mean())
+
+
+def price_put(end_values, strike_value):
+    return float(put_payoff(end_values, strike_value).mean())
+
+
+def mc_estimate(samples, confidence=0.95):
+    samples = np.asarray(samples, dtype=np.float64)
+    n = samples.shape[0]
+    mean = float(samples.mean())
+    std_error = float(samples.std(ddof=1)/np.sqrt(n)) if n > 1 else float('nan')
+    z = float(norm_ppf(0.5 + confidence/2))
+    return MCEstimate(price=mean, std_error=std_error, ci_low=mean - z*std_error, ci_high=mean + z*std_error, num_samples=n)
+
+
+def price_european_mc(s0, mu, sigma, T, strike_value, is_call=True, num_paths=1000, rng=None, r=0.0,
+                      antithetic=False, moment_matching=False, control_variate=None, confidence=0.95, sampler='pseudo',
+                      seed=None):
+    # control_variate='stock' uses the discounted terminal stock, whose mean s0*exp((mu-r)*T) is known exactly.
+    # With antithetic=True the standard error comes from the num_paths//2 pair averages, which are the iid samples.
+    # Moment matching and sampler='sobol' make the draws dependent, so their standard error is the
+    # iid formula and overstates the real error (use independent seeds to measure it for Sobol).
+    if control_variate not in (None, 'stock'):
+        raise ValueError(f"control_variate must be None or 'stock', got {control_variate!r}")
+    rng = make_rng(seed=seed, rng=rng)
+
+    if sampler == 'sobol':
+        if antithetic and num_paths % 2:
+            raise ValueError(f"antithetic sampling needs an even num_paths, got {num_paths}")
+        z = sobol_normals(num_paths//2 if antithetic else num_paths, 1, rng)[:, 0]
+        if antithetic:
+            z = np.concatenate([z, -z])
+    elif sampler == 'pseudo':
+        z = antithetic_normals(rng, num_paths) if antithetic else rng.standard_normal(num_paths)
+    else:
+        raise ValueError(f"sampler must be one of {SAMPLERS}, got {sampler!r}")
+    if moment_matching:
+        moment_match(z)
+
+    end_values = gbm_terminal_from_normals(s0, mu, sigma, T, z)
+    discount = np.exp(-r*T)
+    payoffs = discount*(call_payoff(end_values, strike_value) if is_call else put_payoff(end_values, strike_value))
+    controls = discount*end_values
+    if antithetic:
+        payoffs, controls = pair_average(payoffs), pair_average(controls)
+    if control_variate == 'stock':
+        payoffs = control_variate_adjust(payoffs, controls, s0*np.exp((mu - r)*T))
+    return mc_estimate(payoffs, confidence=confidence)
@@ -0,0 +1,58 @@
+import numpy as np
+
+from ._normal import norm_ppf
+
+# Quasi-Monte Carlo inputs for the GBM engine: scrambled Sobol points pushed through the inverse
+# normal cdf, and a Brownian bridge that spends the best-distributed Sobol dimensions on the
+# coarse shape of each path (W(T) first, then midpoints) instead of on the first few timesteps.
+# scipy is only needed here, and only imported when a Sobol sampler is actually requested.
+
+
+def _sobol_engine(dim, rng):
+    try:
+        from scipy.stats import qmc
+    except ImportError as exc:
+        raise ImportError("sampler='sobol' needs scipy (pip install scipy)") from exc
+    try:
+        return qmc.Sobol(d=dim, scramble=True, rng=rng)
+    except TypeError:
+        # scipy < 1.15 called it seed
+        return qmc.Sobol(d=dim, scramble=True, seed=rng)
+
+
+def sobol_normals(num_paths, dim, rng=None):
+    # Sobol sequences balance best at powers of two; scipy warns about other sizes
+    u = _sobol_engine(dim, rng).random(num_paths)
+    # scrambled points never land exactly on 0, but guard the ppf anyway
+    np.clip(u, np.finfo(np.float64).tiny, 1 - np.finfo(np.float64).epsneg, out=u)
+    return norm_ppf(u)
+
+
+def _bridge_plan(num_steps):
+    # breadth-first bisection of [0, num_steps]: each entry fills `mid` from the already known `left` and `right`
+    plan = []
+    intervals = [(0, num_steps)]
+    while intervals:
+        next_intervals = []
+        for left, right in intervals:
+            if right - left < 2:
+                continue
+            mid = (left + right)//2
+            plan.append((mid, left, right))
+            next_intervals += [(left, mid), (mid, right)]
+        intervals = next_intervals
+    return plan
+
+
+def brownian_bridge(z, dt, out=None):
+    # z has one column per timestep; returns W at times 0, dt, ..., num_steps*dt with W(0) = 0
+    num_paths, num_steps = z.shape
+    if out is None:
+        out = np.empty((num_paths, num_steps+1), dtype=z.dtype)
+    out[:, 0] = 0
+    out[:, num_steps] = np.sqrt(num_steps*dt)*z[:, 0]
+    for k, (mid, left, right) in enumerate(_bridge_plan(num_steps), start=1):
+        weight_left = (right - mid)/(right - left)
+        std = np.sqrt((mid - left)*(right - mid)/(right - left)*dt)
+        out[:, mid] = weight_left*out[:, left] + (1 - weight_left)*out[:, right] + std*z[:, k]
+    return out
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from ._normal import norm_ppf
+from .pricing import MCEstimate
+
+
+@dataclass
+class Moments:
+    # count, mean and sum of squared deviations; merges exactly (Chan et al.) so chunks can be
+    # summarized wherever they were simulated and combined afterwards
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    @classmethod
+    def from_samples(cls, samples):
+        samples = np.asarray(samples, dtype=np.float64)
+        if samples.size == 0:
+            return cls()
+        mean = float(samples.mean())
+        return cls(count=int(samples.size), mean=mean, m2=float(np.square(samples - mean).sum()))
+
+    def merge(self, other):
+        if other.count == 0:
+            return Moments(self.count, self.mean, self.m2)
+        if self.count == 0:
+            return Moments(other.count, other.mean, other.m2)
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        mean = self.mean + delta*other.count/count
+        m2 = self.m2 + other.m2 + delta*delta*self.count*other.count/count
+        return Moments(count, mean, m2)
+
+    def update(self, samples):
+        # batched Welford step: fold a new batch into the running moments
+        return self.merge(Moments.from_samples(samples))
+
+    @property
+    def variance(self):
+        return self.m2/(self.count - 1) if self.count > 1 else float('nan')
+
+    @property
+    def std_error(self):
+        return float(np.sqrt(self.variance/self.count)) if self.count > 1 else float('nan')
+
+    def estimate(self, confidence=0.95):
+        z = float(norm_ppf(0.5 + confidence/2))
+        return MCEstimate(price=self.mean, std_error=self.std_error, ci_low=self.mean - z*self.std_error,
+                          ci_high=self.mean + z*self.std_error, num_samples=self.count)
@@ -0,0 +1,117 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .black_scholes import BSGreeks, bs_greeks
+from .paths import gbm_terminal_from_normals
+from .pricing import mc_estimate
+from .streams import make_rng
+
+# Multi-leg option strategies held as parallel arrays of legs, so every evaluation is one
+# broadcast over (..., num_legs) followed by a dot with the quantities rather than a loop over legs.
+#
+# A leg is a call, a put or a stock position; quantity is signed (negative for short) and premium is
+# paid per unit, so shorts collect it. A stock leg's strike is the price it was bought at, which
+# makes "long call + short put at K" and "stock bought at K" the same payoff.
+
+LEG_TYPES = ('call', 'put', 'stock')
+
+
+@dataclass
+class Strategy:
+    types: np.ndarray
+    strikes: np.ndarray
+    quantities: np.ndarray
+    premiums: np.ndarray
+
+    def __post_init__(self):
+        self.types = np.atleast_1d(np.asarray(self.types))
+        unknown = set(self.types.tolist()) - set(LEG_TYPES)
+        if unknown:
+            raise ValueError(f"leg types must be in {LEG_TYPES}, got {sorted(unknown)}")
+        self.strikes, self.quantities, self.premiums = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (self.strikes, self.quantities, self.premiums)))
+        if self.strikes.shape != self.types.shape:
+            raise ValueError(f"got {len(self.types)} leg types for {len(self.strikes)} strikes")
+
+    @classmethod
+    def from_legs(cls, legs):
+        # legs: (type, strike, quantity) or (type, strike, quantity, premium) tuples
+        legs = [tuple(leg) + (0.0,)*(4 - len(leg)) for leg in legs]
+        types, strikes, quantities, premiums = zip(*legs)
+        return cls(types, strikes, quantities, premiums)
+
+    @classmethod
+    def butterfly(cls, center, width, option_type='call', premiums=0.0):
+        return cls([option_type]*3, [center - width, center, center + width], [1, -2, 1], premiums)
+
+    @classmethod
+    def straddle(cls, strike, quantity=1, premiums=0.0):
+        return cls(['call', 'put'], [strike, strike], quantity, premiums)
+
+    @classmethod
+    def spread(cls, long_strike, short_strike, option_type='call', premiums=0.0):
+        return cls([option_type]*2, [long_strike, short_strike], [1, -1], premiums)
+
+    @property
+    def num_legs(self):
+        return len(self.types)
+
+    @property
+    def cost(self):
+        return float(self.quantities @ self.premiums)
+
+    def leg_payoffs(self, prices):
+        # payoff of one unit of each leg, shaped prices.shape + (num_legs,)
+        prices = np.asarray(prices, dtype=np.float64)[..., None]
+        intrinsic = prices - self.strikes
+        return np.where(self.types == 'call', np.maximum(intrinsic, 0),
+                        np.where(self.types == 'put', np.maximum(-intrinsic, 0), intrinsic))
+
+    def payoff(self, prices):
+        # value at expiry of the whole position, before premiums
+        return self.leg_payoffs(prices) @ self.quantities
+
+    def profit(self, prices):
+        return self.payoff(prices) - self.cost
+
+    def bs_greeks(self, S, T, sigma, r=0.0):
+        # analytic value and Greeks of the position, for scalar or broadcastable S, T, sigma
+        S, T, sigma = (np.asarray(x, dtype=np.float64)[..., None] for x in (S, T, sigma))
+        legs = bs_greeks(S, self.strikes, T, sigma, r, self.types == 'call')
+        stock = self.types == 'stock'
+        discounted_K = self.strikes*np.exp(-r*T)
+        # a stock leg bought at K is a forward: worth S - K*exp(-rT), delta 1
+        stock_legs = dict(price=S - discounted_K, delta=np.ones_like(discounted_K), rho=T*discounted_K,
+                          theta=-r*discounted_K)
+        fields = {}
+        for f in ('price', 'delta', 'gamma', 'vega', 'theta', 'rho'):
+            values = np.where(stock, stock_legs.get(f, 0.0), getattr(legs, f))
+            fields[f] = values @ self.quantities
+        return BSGreeks(**fields)
+
+    def _discounted_payoffs(self, s0, sigma, T, r, z):
+        return np.exp(-r*T)*self.payoff(gbm_terminal_from_normals(s0, r, sigma, T, z))
+
+    def mc_price(self, s0, sigma, T, r=0.0, num_paths=100_000, seed=None, rng=None, confidence=0.95):
+        # risk-neutral price of the position from one set of terminal draws shared by every leg
+        z = make_rng(seed=seed, rng=rng).standard_normal(num_paths)
+        return mc_estimate(self._discounted_payoffs(s0, sigma, T, r, z), confidence=confidence)
+
+    def mc_greeks(self, s0, sigma, T, r=0.0, num_paths=100_000, seed=None, rng=None, bump=1e-2):
+        # central differences on common random numbers: every bumped price reuses the same z
+        z = make_rng(seed=seed, rng=rng).standard_normal(num_paths)
+
+        def price(s0=s0, sigma=sigma, T=T, r=r):
+            return float(self._discounted_payoffs(s0, sigma, T, r, z).mean())
+
+        base = price()
+        h_s, h_vol, h_T, h_r = bump*s0, max(bump*sigma, 1e-8), bump*T, 1e-4
+        up, down = price(s0=s0 + h_s), price(s0=s0 - h_s)
+        vol_down = max(sigma - h_vol, 0.0)
+        return BSGreeks(price=base,
+                        delta=(up - down)/(2*h_s),
+                        gamma=(up - 2*base + down)/(h_s*h_s),
+                        vega=(price(sigma=sigma + h_vol) - price(sigma=vol_down))/(sigma + h_vol - vol_down),
+                        theta=-(price(T=T + h_T) - price(T=T - h_T))/(2*h_T),
+                        rho=(price(r=r + h_r) - price(r=r - h_r))/(2*h_r))
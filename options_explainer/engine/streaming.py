@@ -0,0 +1,69 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from .histogram import RunningHistogram
+from .paths import _check_sampler, _fill_terminal_block
+from .payoffs import call_payoff, put_payoff
+from .pricing import MCEstimate
+from .stats import Moments
+
+# Constant-memory Monte Carlo: batches of terminal prices are folded into running moments and a
+# RunningHistogram, then dropped, until the standard error is under tol, the time budget is
+# spent, max_paths is reached or the batches run out.
+
+
+@dataclass
+class StreamingResult:
+    estimate: MCEstimate
+    histogram: RunningHistogram
+    num_batches: int
+    stopped: str
+    elapsed: float
+
+
+def terminal_batches(s0, mu, sigma, T=30, batch_size=10_000, seed=None, sampler='pseudo', dtype=np.float64):
+    # endless batches of S_T, each from its own stream spawned off seed, reusing one buffer
+    # (so consumers must be done with a batch before asking for the next)
+    _check_sampler(sampler)
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    out = np.empty(batch_size, dtype=dtype)
+    while True:
+        rng = np.random.default_rng(seed_seq.spawn(1)[0])
+        _fill_terminal_block(out, s0, mu, sigma, T, rng, sampler)
+        yield out
+
+
+def streaming_price(batches, strike_value, is_call=True, tol=None, time_budget=None, max_paths=None, min_paths=1_000,
+                    bin_edges=None, num_bins=64, confidence=0.95):
+    # tol is on the standard error of the price, time_budget in seconds; with neither, stops at max_paths.
+    # bin_edges fixes the histogram bins, otherwise it uses the adaptive log lattice
+    if tol is None and time_budget is None and max_paths is None:
+        raise ValueError("need at least one of tol, time_budget or max_paths to know when to stop")
+
+    start = time.perf_counter()
+    moments = Moments()
+    histogram = RunningHistogram(num_bins=num_bins) if bin_edges is None else RunningHistogram(bin_edges=bin_edges)
+    num_batches = 0
+    stopped = 'exhausted'
+    for end_values in batches:
+        if max_paths is not None and moments.count + len(end_values) > max_paths:
+            end_values = end_values[:max_paths - moments.count]
+        payoffs = call_payoff(end_values, strike_value) if is_call else put_payoff(end_values, strike_value)
+        moments = moments.update(payoffs)
+        histogram.update(end_values)
+        num_batches += 1
+
+        if max_paths is not None and moments.count >= max_paths:
+            stopped = 'max_paths'
+            break
+        if tol is not None and moments.count >= min_paths and moments.std_error <= tol:
+            stopped = 'tolerance'
+            break
+        if time_budget is not None and time.perf_counter() - start >= time_budget:
+            stopped = 'time_budget'
+            break
+
+    return StreamingResult(estimate=moments.estimate(confidence=confidence), histogram=histogram,
+                           num_batches=num_batches, stopped=stopped, elapsed=time.perf_counter() - start)
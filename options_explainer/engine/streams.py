@@ -0,0 +1,32 @@
+import numpy as np
+
+# Random streams for chunked simulation. A seed is turned into one independent Generator per
+# chunk of paths through SeedSequence.spawn, so chunk i always sees the same stream no matter
+# which thread or process ends up simulating it: the same (seed, chunk_size) is bit-identical
+# run serially or in parallel. Changing chunk_size changes the streams, and so the draws.
+
+
+def path_chunks(num_paths, chunk_size=None):
+    if chunk_size is None or chunk_size >= num_paths:
+        return [(0, num_paths)]
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    return [(start, min(start + chunk_size, num_paths)) for start in range(0, num_paths, chunk_size)]
+
+
+def seed_sequences(seed, num_streams):
+    seed_seq = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return seed_seq.spawn(num_streams)
+
+
+def chunk_generators(num_chunks, seed=None, rng=None):
+    # rng keeps the old single-Generator behaviour for one chunk, and spawns children from it otherwise
+    if rng is not None and seed is not None:
+        raise ValueError("pass either seed or rng, not both")
+    if rng is not None:
+        return [rng] if num_chunks == 1 else list(rng.spawn(num_chunks))
+    return [np.random.default_rng(s) for s in seed_sequences(seed, num_chunks)]
+
+
+def make_rng(seed=None, rng=None):
+    return chunk_generators(1, seed=seed, rng=rng)[0]
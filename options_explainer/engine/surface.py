@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from .black_scholes import bs_greeks
+from .interpolation import multilinear_interpolate
+from .streams import make_rng
+
+# Price and Greek surfaces over strike x expiry x vol, shaped (len(strikes), len(expiries), len(vols)).
+#
+# The Monte Carlo backend draws one set of normals and reuses it for every grid point (common
+# random numbers), so neighbouring points share their noise and the surface comes out smooth.
+# For each (expiry, vol) the terminal prices are sorted once; with suffix sums of S and S**2 every
+# strike is then priced by a searchsorted instead of a pass over the paths. Greeks are central
+# differences on the same draws (spot bumps only rescale S_T, so they reuse the sort); rho is the
+# pathwise estimator +-K*T*exp(-rT)*P(in the money), also read off the sort.
+
+BACKENDS = ('analytic', 'mc')
+FIELDS = ('price', 'delta', 'gamma', 'vega', 'theta', 'rho')
+
+
+@dataclass
+class PriceSurface:
+    strikes: np.ndarray
+    expiries: np.ndarray
+    vols: np.ndarray
+    price: np.ndarray
+    delta: np.ndarray
+    gamma: np.ndarray
+    vega: np.ndarray
+    theta: np.ndarray
+    rho: np.ndarray
+    std_error: np.ndarray = None
+
+    def interpolate(self, strike, expiry, vol, field='price'):
+        if field not in FIELDS:
+            raise ValueError(f"field must be one of {FIELDS}, got {field!r}")
+        points = np.stack(np.broadcast_arrays(strike, expiry, vol), axis=-1)
+        return multilinear_interpolate((self.strikes, self.expiries, self.vols), getattr(self, field), points)
+
+
+class _SortedTerminal:
+    # E[max(c*S - K, 0)] (or the put) for many strikes K and a scale c from one sort of S
+
+    def __init__(self, end_values):
+        self.sorted = np.sort(end_values)
+        self.num_paths = len(end_values)
+        self.suffix = np.concatenate([np.cumsum(self.sorted[::-1])[::-1], [0.0]])
+        self.suffix_sq = np.concatenate([np.cumsum(np.square(self.sorted)[::-1])[::-1], [0.0]])
+
+    def payoff_moments(self, strikes, is_call, scale=1.0):
+        k = strikes/scale
+        idx = np.searchsorted(self.sorted, k, side='right')
+        above, above_sum, above_sq = self.num_paths - idx, self.suffix[idx], self.suffix_sq[idx]
+        if is_call:
+            first = above_sum - k*above
+            second = above_sq - 2*k*above_sum + k*k*above
+        else:
+            below_sum, below_sq = self.suffix[0] - above_sum, self.suffix_sq[0] - above_sq
+            first = k*idx - below_sum
+            second = k*k*idx - 2*k*below_sum + below_sq
+        mean = scale*first/self.num_paths
+        second_moment = scale*scale*second/self.num_paths
+        return mean, second_moment
+
+    def price(self, strikes, is_call, scale=1.0):
+        return self.payoff_moments(strikes, is_call, scale)[0]
+
+    def in_the_money(self, strikes, is_call):
+        above = self.num_paths - np.searchsorted(self.sorted, strikes, side='right')
+        return (above if is_call else self.num_paths - above)/self.num_paths
+
+
+def _analytic_surface(s0, strikes, expiries, vols, r, is_call):
+    greeks = bs_greeks(s0, strikes[:, None, None], expiries[None, :, None], vols[None, None, :], r, is_call)
+    return PriceSurface(strikes, expiries, vols, greeks.price, greeks.delta, greeks.gamma, greeks.vega,
+                        greeks.theta, greeks.rho)
+
+
+def _mc_surface(s0, strikes, expiries, vols, r, is_call, num_paths, seed, rng, bump):
+    z = make_rng(seed=seed, rng=rng).standard_normal(num_paths)
+    shape = (len(strikes), len(expiries), len(vols))
+    fields = {name: np.empty(shape) for name in FIELDS + ('std_error',)}
+    h_spot = bump*s0
+
+    def terminal(T, vol):
+        return _SortedTerminal(s0*np.exp((r - 0.5*vol*vol)*T + vol*np.sqrt(T)*z))
+
+    def discounted(T):
+        return np.exp(-r*T)
+
+    for j, T in enumerate(expiries):
+        h_T = min(bump*T, 0.5*T) if T > 0 else 0.0
+        for k, vol in enumerate(vols):
+            base = terminal(T, vol)
+            mean, second = base.payoff_moments(strikes, is_call)
+            df = discounted(T)
+            fields['price'][:, j, k] = df*mean
+            fields['std_error'][:, j, k] = df*np.sqrt(np.maximum(second - mean*mean, 0.0)/max(num_paths - 1, 1))
+
+            # S_T is linear in s0: a spot bump is the same sort, rescaled
+            up, down = base.price(strikes, is_call, 1 + bump), base.price(strikes, is_call, 1 - bump)
+            fields['delta'][:, j, k] = df*(up - down)/(2*h_spot)
+            fields['gamma'][:, j, k] = df*(up - 2*mean + down)/(h_spot*h_spot)
+            sign = 1 if is_call else -1
+            fields['rho'][:, j, k] = sign*strikes*T*df*base.in_the_money(strikes, is_call)
+
+            h_vol = max(bump*vol, 1e-8)
+            fields['vega'][:, j, k] = (terminal(T, vol + h_vol).price(strikes, is_call)
+                                       - terminal(T, max(vol - h_vol, 0.0)).price(strikes, is_call)) \
+                * df/(vol + h_vol - max(vol - h_vol, 0.0))
+            if h_T > 0:
+                fields['theta'][:, j, k] = -(discounted(T + h_T)*terminal(T + h_T, vol).price(strikes, is_call)
+                                             - discounted(T - h_T)*terminal(T - h_T, vol).price(strikes, is_call))/(2*h_T)
+            else:
+                fields['theta'][:, j, k] = np.nan
+
+    return PriceSurface(strikes, expiries, vols, **fields)
+
+
+def price_surface(s0, strikes, expiries, vols, r=0.0, is_call=True, backend='analytic', num_paths=20_000, seed=None,
+                  rng=None, bump=1e-2):
+    # T, vol and r share a time unit, like bs_greeks; bump is the relative size of the MC finite differences
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    strikes, expiries, vols = (np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in (strikes, expiries, vols))
+    for name, axis in (('strikes', strikes), ('expiries', expiries), ('vols', vols)):
+        if axis.ndim != 1 or np.any(np.diff(axis) <= 0):
+            raise ValueError(f"{name} must be a strictly increasing 1-d array")
+    if backend == 'analytic':
+        return _analytic_surface(s0, strikes, expiries, vols, r, is_call)
+    return _mc_surface(s0, strikes, expiries, vols, r, is_call, num_paths, seed, rng, bump)
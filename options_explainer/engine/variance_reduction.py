@@ -0,0 +1,29 @@
+import numpy as np
+
+
+def antithetic_normals(rng, num_paths, dtype=np.float64):
+    # first half is z, second half is -z, so pair i is (i, i + num_paths//2)
+    if num_paths % 2:
+        raise ValueError(f"antithetic sampling needs an even num_paths, got {num_paths}")
+    half = rng.standard_normal(num_paths//2, dtype=dtype)
+    return np.concatenate([half, -half])
+
+
+def pair_average(samples):
+    # collapses antithetic pairs into the independent samples the standard error is computed from
+    half = samples.shape[0]//2
+    return 0.5*(samples[:half] + samples[half:])
+
+
+def moment_match(z):
+    # rescales the draws (per column for 2-d input) to exactly zero mean and unit variance
+    z -= z.mean(axis=0)
+    z /= z.std(axis=0)
+    return z
+
+
+def control_variate_adjust(samples, controls, control_mean):
+    # samples - beta*(controls - E[controls]) with the variance-minimizing beta estimated from the draws
+    cov = np.cov(samples, controls)
+    beta = cov[0, 1]/cov[1, 1] if cov[1, 1] > 0 else 0.0
+    return samples - beta*(controls - control_mean)
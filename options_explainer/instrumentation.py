@@ -0,0 +1,140 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import time
+from collections import defaultdict
+
+# Opt-in rerun profiling for the Streamlit page. The page opens a Profiler at the top of every
+# rerun and marks where each section starts; helpers anywhere below it find the active profiler
+# through current_profiler() to time their calls and bump counters (paths simulated, cache hits,
+# chart bytes). When profiling is off every hook is a no-op, so the page pays one context
+# variable lookup per call.
+#
+# Turn it on with OPTIONS_EXPLAINER_PROFILE=1 (or ?profile=1 in the page URL); set
+# OPTIONS_EXPLAINER_PROFILE_LOG to a file path to also append one JSON line per rerun there.
+#
+# Sections that are Streamlit fragments also rerun on their own, without the rest of the page (and
+# so without its profiler). fragment_section gives such a rerun a profiler of its own.
+
+ENABLE_ENV = 'OPTIONS_EXPLAINER_PROFILE'
+LOG_ENV = 'OPTIONS_EXPLAINER_PROFILE_LOG'
+
+_active = contextvars.ContextVar('options_explainer_profiler', default=None)
+
+
+def profiling_requested(query_params=None):
+    if os.environ.get(ENABLE_ENV, '').lower() in ('1', 'true', 'yes'):
+        return True
+    return query_params is not None and query_params.get('profile') in ('1', 'true')
+
+
+class Profiler:
+
+    def __init__(self, enabled=False, log_path=None, cache=None):
+        # cache is anything with a stats() dict holding hits/misses, like the engine's simulation_cache
+        self.enabled = enabled
+        self.log_path = log_path
+        self.cache = cache
+        self.sections = []
+        self._section = None
+        self._logged = False
+        self.finished = False
+        self._started = time.perf_counter()
+
+    def activate(self):
+        # makes this the profiler current_profiler() hands out, for the rest of this thread's rerun
+        _active.set(self)
+        return self
+
+    def _cache_stats(self):
+        if self.cache is None:
+            return {}
+        stats = self.cache.stats()
+        return dict(cache_hits=stats['hits'], cache_misses=stats['misses'])
+
+    def section(self, name):
+        # ends the current section (if any) and starts timing the next one
+        if not self.enabled:
+            return
+        self._close_section()
+        self._section = dict(name=name, start=time.perf_counter(), counters=defaultdict(int),
+                             calls=defaultdict(lambda: [0, 0.0]), cache_before=self._cache_stats())
+
+    def _close_section(self):
+        section, self._section = self._section, None
+        if section is None:
+            return
+        counters = dict(section['counters'])
+        cache_after = self._cache_stats()
+        for key, before in section['cache_before'].items():
+            counters[key] = cache_after[key] - before
+        self.sections.append(dict(section=section['name'], seconds=time.perf_counter() - section['start'],
+                                  counters=counters,
+                                  calls={name: dict(count=c, seconds=s) for name, (c, s) in section['calls'].items()}))
+
+    def count(self, name, value=1):
+        if self.enabled and self._section is not None:
+            self._section['counters'][name] += value
+
+    def record_call(self, name, seconds):
+        if self.enabled and self._section is not None:
+            call = self._section['calls'][name]
+            call[0] += 1
+            call[1] += seconds
+
+    def finish(self):
+        self.finished = True
+        if not self.enabled:
+            return self.sections
+        self._close_section()
+        if self.log_path and not self._logged:
+            self._logged = True
+            with open(self.log_path, 'a') as f:
+                f.write(json.dumps(self.report()) + '\n')
+        return self.sections
+
+    def report(self):
+        return dict(timestamp=time.time(), total_seconds=time.perf_counter() - self._started, sections=self.sections)
+
+
+_disabled = Profiler(enabled=False)
+
+
+def current_profiler():
+    return _active.get() or _disabled
+
+
+@contextlib.contextmanager
+def fragment_section(name, enabled=False, log_path=None, cache=None):
+    # during a full rerun this is just the next section of the page's profiler, and yields None.
+    # When the section reruns alone, the page's profiler is the finished one from the last full
+    # rerun (or there is none), so the section is timed by a new profiler, which is yielded so the
+    # caller can report it
+    profiler = current_profiler()
+    if profiler is not _disabled and not profiler.finished:
+        profiler.section(name)
+        yield None
+        return
+    profiler = Profiler(enabled=enabled, log_path=log_path, cache=cache).activate()
+    profiler.section(name)
+    try:
+        yield profiler
+    finally:
+        profiler.finish()
+
+
+def instrumented(func):
+    # times every call to func against the section the page is in, under the function's name
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = current_profiler()
+        if not profiler.enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.record_call(func.__name__, time.perf_counter() - start)
+    return wrapper
@@ -0,0 +1,151 @@
+import numpy as np
+
+from options_explainer.engine import path_quantiles
+
+# Plotly is imported inside the functions that build figures rather than up here: plotly's figure
+# machinery takes a few hundred milliseconds to load, and importing this module (or the page) shouldn't
+# pay for it before the first chart is actually drawn. Python caches the module after the first call.
+
+FAN_QUANTILES = (5, 25, 50, 75, 95)
+
+
+def _path_traces(t, S, max_paths=None):
+    # Past max_paths, draw an evenly spaced sample of paths over percentile fan bands
+    # computed from every path, so the chart payload doesn't grow with num_paths
+    import plotly.graph_objects as go
+
+    num_paths = S.shape[0]
+    if max_paths is None or num_paths <= max_paths:
+        return [go.Scatter(x=t, y=S[i,:], mode='lines', name=f'Path {i+1}') for i in range(num_paths)]
+
+    q5, q25, q50, q75, q95 = path_quantiles(S, FAN_QUANTILES)
+    traces = []
+    for lo, hi, lo_name, hi_name, fill in ((q5, q95, '5th pct', '95th pct', 'rgba(99, 110, 250, 0.15)'),
+                                           (q25, q75, '25th pct', '75th pct', 'rgba(99, 110, 250, 0.3)')):
+        traces.append(go.Scatter(x=t, y=hi, mode='lines', line=dict(width=0), name=hi_name, showlegend=False))
+        traces.append(go.Scatter(x=t, y=lo, mode='lines', line=dict(width=0), fill='tonexty', fillcolor=fill, name=f'{lo_name} - {hi_name}'))
+
+    for i in np.linspace(0, num_paths-1, max_paths).astype(int):
+        traces.append(go.Scatter(x=t, y=S[i,:], mode='lines', line=dict(width=1), opacity=0.5, name=f'Path {i+1}'))
+    traces.append(go.Scatter(x=t, y=q50, mode='lines', line=dict(color='black', width=2), name='Median'))
+    return traces
+
+
+def _end_value_bars(hist_values, bin_edges, strike_threshold=None):
+    # Color the bins by which side of the strike they land on, when there is one
+    import plotly.graph_objects as go
+
+    marker_color = None
+    if strike_threshold is not None:
+        marker_color = ['red' if x < strike_threshold else 'green' for x in bin_edges[:-1]]
+    return go.Bar(y=bin_edges[:-1], x=hist_values, orientation='h', marker_color=marker_color, name='End Values')
+
+
+def paths_figure(t, S, title='Simulated Stock Paths', max_paths=None):
+    import plotly.graph_objects as go
+
+    fig_paths = go.Figure()
+    for trace in _path_traces(t, S, max_paths):
+        fig_paths.add_trace(trace)
+
+    fig_paths.update_layout(
+        title=title,
+        xaxis_title='Time',
+        yaxis_title='Price',
+        showlegend=True,
+        width=800,
+        height=500,
+    )
+    return fig_paths
+
+
+def paths_histogram_figure(t, S, hist_values, bin_edges, strike_threshold=None, title='Simulated Stock Paths and Expiration Price Distribution', max_paths=None):
+    # Create subplots with one row and two columns
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=1, cols=2, subplot_titles=('Stock Paths', 'End Value Histogram'), column_widths=[0.7, 0.3])
+
+    # Add GBM paths to the first subplot
+    for trace in _path_traces(t, S, max_paths):
+        fig.add_trace(trace, row=1, col=1)
+
+    # Add a bar chart with bins and counts to the second subplot
+    fig.add_trace(_end_value_bars(hist_values, bin_edges, strike_threshold), row=1, col=2)
+
+    # Update layout
+    fig.update_layout(
+        title=title,
+        xaxis_title='Counts',
+        yaxis_title='Price',
+        xaxis2=dict(domain=[0.75, 1.0]),
+        yaxis2=dict(anchor='x2'),
+        showlegend=False,  # Set to False to avoid legend duplication
+        width=1000,
+        height=500,
+    )
+    return fig
+
+
+def terminal_histogram_figure(hist_values, bin_edges, strike_threshold=None, title='Expiration Price Distribution'):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    fig.add_trace(_end_value_bars(hist_values, bin_edges, strike_threshold))
+    fig.update_layout(
+        title=title,
+        xaxis_title='Counts',
+        yaxis_title='Price',
+        showlegend=False,
+        width=800,
+        height=500,
+    )
+    return fig
+
+
+def pnl_histogram_figure(pnls, num_bins=40, title='Delta-Hedged P&L at Expiry'):
+    # pnls maps a label to per-path P&L; binned here on shared edges so the payload is num_bins per trace
+    import plotly.graph_objects as go
+
+    edges = np.histogram_bin_edges(np.concatenate(list(pnls.values())), bins=num_bins)
+    centers = 0.5*(edges[1:] + edges[:-1])
+    fig = go.Figure()
+    for name, pnl in pnls.items():
+        counts, _ = np.histogram(pnl, bins=edges)
+        fig.add_trace(go.Bar(x=centers, y=counts, width=np.diff(edges), opacity=0.6, name=name))
+    fig.update_layout(
+        title=title,
+        xaxis_title='P&L',
+        yaxis_title='Counts',
+        barmode='overlay',
+        width=800,
+        height=500,
+    )
+    return fig
+
+
+def line_figure(x, y, title, xaxis_title, yaxis_title):
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Scatter(x=x, y=y, mode='lines'))
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    return fig
+
+
+def lines_figure(x, lines, title, xaxis_title, yaxis_title):
+    # lines maps a legend name to y values; every line after the first is dashed so overlaps stay visible
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for i, (name, y) in enumerate(lines.items()):
+        fig.add_trace(go.Scatter(x=x, y=y, name=name, line=dict(dash='dash') if i else None))
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    return fig
+
+
+def colored_bar_figure(x, y, colors, title, xaxis_title, yaxis_title):
+    # bars labelled with their (rounded) heights
+    import plotly.graph_objects as go
+
+    fig = go.Figure(go.Bar(x=x, y=y, marker_color=colors, text=np.round(y, 1), textposition='outside'))
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title=yaxis_title)
+    return fig
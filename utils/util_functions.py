@@ -1,137 +1,186 @@
+import contextlib
+import os
+
 import streamlit as st
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-
-def calculate_long_call_payoff(underlying_prices, strike_price, premium):
-    payoffs = np.where(underlying_prices <= strike_price, -premium, (underlying_prices - strike_price) - premium)
-    return payoffs
-
-def calculate_long_put_payoff(underlying_prices, strike_price, premium):
-    put_payoffs = np.where(underlying_prices <= strike_price, (strike_price - underlying_prices) - premium, -premium)
-    return put_payoffs
-
-def roll_dice():
-    return np.random.randint(1, 7)
-
-def simulate_gbm_paths(s0, mu, sigma, n=24, T=30, num_paths=1000, plot=True):
-    dt = 1/n
-    t = np.linspace(0, T, n*T+1)
-    S = np.zeros((num_paths, n*T+1))
-    
-    for i in range(num_paths):
-        W = np.random.standard_normal(size=n*T+1)
-        W = np.cumsum(W)*np.sqrt(dt)
-        X = (mu-0.5*sigma**2)*t + sigma*W
-        S[i,:] = s0*np.exp(X)
-        
-        
-    fig_paths = go.Figure()
-    for i in range(num_paths):
-        fig_paths.add_trace(go.Scatter(x=t, y=S[i,:], mode='lines', name=f'Path {i+1}'))
-
-    fig_paths.update_layout(
-        title='Simulated Stock Paths',
-        xaxis_title='Time',
-        yaxis_title='Price',
-        showlegend=True,
-        width=800,
-        height=500,
-    )
-    if plot:
-        st.plotly_chart(fig_paths)
-def simulate_gbm_paths_plotly_histogram_with_bins(s0, mu, sigma, n=24, T=30, num_paths=1000, num_bins=20):
-    dt = 1/n
-    t = np.linspace(0, T, n*T+1)
-    S = np.zeros((num_paths, n*T+1))
-    
-    for i in range(num_paths):
-        W = np.random.standard_normal(size=n*T+1)
-        W = np.cumsum(W)*np.sqrt(dt)
-        X = (mu-0.5*sigma**2)*t + sigma*W
-        S[i,:] = s0*np.exp(X)
-    
-    # Calculate end values
-    end_values = S[:, -1]
-    
-    # Calculate histogram data
-    hist_values, bin_edges = np.histogram(end_values, bins=num_bins)
-    
-    # Create subplots with one row and two columns
-    fig = make_subplots(rows=1, cols=2, subplot_titles=('Stock Paths', 'End Value Histogram'), column_widths=[0.7, 0.3])
-    
-    # Add GBM paths to the first subplot
-    for i in range(num_paths):
-        fig.add_trace(go.Scatter(x=t, y=S[i,:], mode='lines', name=f'Path {i+1}'), row=1, col=1)
-
-    
-    # Add a bar chart with bins and counts to the second subplot
-    fig.add_trace(go.Bar(y=bin_edges[:-1], x=hist_values, orientation='h', name='End Values'), row=1, col=2)
-    
-    # Update layout
-    fig.update_layout(
-        title='Simulated Stock Paths and Expiration Price Distribution',
-        xaxis_title='Counts',
-        yaxis_title='Price',
-        xaxis2=dict(domain=[0.75, 1.0]),
-        yaxis2=dict(anchor='x2'),
-        showlegend=False,  # Set to False to avoid legend duplication
-        width=1000,
-        height=500,
-    )
-    
-    st.plotly_chart(fig)
 
-def simulate_gbm_paths_plotly_histogram_with_bins_and_color(s0, mu, sigma, n=24, T=30, num_paths=1000, num_bins=20, strike_threshold=200):
-    dt = 1/n
-    t = np.linspace(0, T, n*T+1)
-    S = np.zeros((num_paths, n*T+1))
-    
-    for i in range(num_paths):
-        W = np.random.standard_normal(size=n*T+1)
-        W = np.cumsum(W)*np.sqrt(dt)
-        X = (mu-0.5*sigma**2)*t + sigma*W
-        S[i,:] = s0*np.exp(X)
-    
-    # Calculate end values
-    end_values = S[:, -1]
-    
-    # Calculate histogram data
-    hist_values, bin_edges = np.histogram(end_values, bins=num_bins)
-    
-    # Create subplots with one row and two columns
-    fig = make_subplots(rows=1, cols=2, subplot_titles=('Stock Paths', 'End Value Histogram'), column_widths=[0.7, 0.3])
-    
-    # Add GBM paths to the first subplot
-    for i in range(num_paths):
-        fig.add_trace(go.Scatter(x=t, y=S[i,:], mode='lines', name=f'Path {i+1}'), row=1, col=1)
-
-    colors_strike = ['red' if x < strike_threshold else 'green' for x in bin_edges[:-1]]
-    
-    # Add a bar chart with bins and counts to the second subplot
-    fig.add_trace(go.Bar(y=bin_edges[:-1], x=hist_values, orientation='h', marker_color=colors_strike, name='End Values'), row=1, col=2)
-    
-    # Update layout
-    fig.update_layout(
-        title='Simulated Stock Paths and Colored Expiration Price Distribution',
-        xaxis_title='Counts',
-        yaxis_title='Price',
-        xaxis2=dict(domain=[0.75, 1.0]),
-        yaxis2=dict(anchor='x2'),
-        showlegend=False,  # Set to False to avoid legend duplication
-        width=1000,
-        height=500,
-    )
-    
+from options_explainer.engine import (
+    asian_payoff,
+    barrier_payoff,
+    bs_greeks,
+    calculate_long_call_payoff,
+    calculate_long_put_payoff,
+    call_payoff,
+    lookback_payoff,
+    mc_estimate,
+    price_european_mc,
+    simulation_cache,
+    streaming_price,
+    terminal_batches,
+    terminal_histogram,
+)
+from options_explainer.instrumentation import LOG_ENV, current_profiler, fragment_section, instrumented, profiling_requested
+from options_explainer.rendering import paths_figure, paths_histogram_figure, pnl_histogram_figure, terminal_histogram_figure
+
+# most paths drawn individually on a chart, anything past this is summarized as percentile bands
+MAX_PLOTTED_PATHS = 20
+
+def plot_chart(fig):
+    # st.plotly_chart, counting the figure's serialized size when the rerun is being profiled
+    profiler = current_profiler()
+    if profiler.enabled:
+        profiler.count('charts')
+        profiler.count('chart_bytes', len(fig.to_json()))
     st.plotly_chart(fig)
 
+def profile_panel(profiler):
+    # the hidden debug panel, only drawn when the rerun is being profiled
+    sections = profiler.finish()
+    if not profiler.enabled:
+        return
+    with st.expander("Debug: rerun profile"):
+        st.dataframe([dict(section=s['section'], ms=round(s['seconds']*1e3, 1), **s['counters']) for s in sections])
+        calls = [dict(section=s['section'], call=name, count=c['count'], ms=round(c['seconds']*1e3, 1))
+                 for s in sections for name, c in s['calls'].items()]
+        if calls:
+            st.dataframe(calls)
+
+@contextlib.contextmanager
+def page_section(name):
+    # wraps the body of an st.fragment section: part of the page's profile on a full rerun, and
+    # profiled on its own, with its own debug panel, when a widget inside it reruns just the fragment
+    with fragment_section(name, enabled=profiling_requested(st.query_params), log_path=os.environ.get(LOG_ENV),
+                          cache=simulation_cache) as own:
+        yield
+    if own is not None:
+        profile_panel(own)
+
+@instrumented
+def simulate_gbm_paths(s0, mu, sigma, n=24, T=30, num_paths=1000, plot=True, seed=None):
+    current_profiler().count('paths', num_paths)
+    sim = simulation_cache.simulate_gbm(s0, mu, sigma, n=n, T=T, num_paths=num_paths, seed=seed)
+    fig_paths = paths_figure(sim.t, sim.paths, max_paths=MAX_PLOTTED_PATHS)
+    if plot:
+        plot_chart(fig_paths)
+
+@instrumented
+def simulate_jump_paths(s0, mu, sigma, jump_intensity, jump_mean, jump_std, n=24, T=30, num_paths=100, seed=None):
+    current_profiler().count('paths', num_paths)
+    sim = simulation_cache.simulate_merton(s0, mu, sigma, jump_intensity, jump_mean, jump_std, n=n, T=T, num_paths=num_paths, seed=seed)
+    plot_chart(paths_figure(sim.t, sim.paths, title='Simulated Stock Paths with News Jumps', max_paths=MAX_PLOTTED_PATHS))
+
+@instrumented
+def simulate_stochastic_vol_paths(s0, mu, v0, kappa, theta, xi, rho, n=24, T=30, num_paths=100, seed=None):
+    current_profiler().count('paths', num_paths)
+    sim = simulation_cache.simulate_heston(s0, mu, v0, kappa, theta, xi, rho, n=n, T=T, num_paths=num_paths, seed=seed)
+    plot_chart(paths_figure(sim.t, sim.paths, title='Simulated Stock Paths with Changing Volatility', max_paths=MAX_PLOTTED_PATHS))
+
+@instrumented
+def simulate_gbm_paths_plotly_histogram_with_bins(s0, mu, sigma, n=24, T=30, num_paths=1000, num_bins=20, seed=None):
+    current_profiler().count('paths', num_paths)
+    sim = simulation_cache.simulate_gbm(s0, mu, sigma, n=n, T=T, num_paths=num_paths, seed=seed)
+    hist_values, bin_edges = terminal_histogram(sim.terminal, num_bins=num_bins)
+    fig = paths_histogram_figure(sim.t, sim.paths, hist_values, bin_edges, max_paths=MAX_PLOTTED_PATHS)
+    plot_chart(fig)
+
+@instrumented
+def simulate_gbm_paths_plotly_histogram_with_bins_and_color(s0, mu, sigma, n=24, T=30, num_paths=1000, num_bins=20, strike_threshold=200, terminal_only=False, seed=None):
+    # terminal_only skips the intraday steps and the path panel, for when only the expiry distribution matters
+    current_profiler().count('paths', num_paths)
+    if terminal_only:
+        end_values = simulation_cache.simulate_gbm_terminal(s0, mu, sigma, T=T, num_paths=num_paths, seed=seed)
+        hist_values, bin_edges = terminal_histogram(end_values, num_bins=num_bins)
+        fig = terminal_histogram_figure(hist_values, bin_edges, strike_threshold=strike_threshold,
+                                        title='Colored Expiration Price Distribution')
+    else:
+        sim = simulation_cache.simulate_gbm(s0, mu, sigma, n=n, T=T, num_paths=num_paths, seed=seed)
+        end_values = sim.terminal
+        hist_values, bin_edges = terminal_histogram(end_values, num_bins=num_bins)
+        fig = paths_histogram_figure(sim.t, sim.paths, hist_values, bin_edges, strike_threshold=strike_threshold,
+                                     title='Simulated Stock Paths and Colored Expiration Price Distribution',
+                                     max_paths=MAX_PLOTTED_PATHS)
+    plot_chart(fig)
+
     return end_values, strike_threshold
 
 
+def _show_confidence_interval(estimate):
+    st.latex(f"95\\% \\text{{ confidence interval: }} [{estimate.ci_low:.4f}, {estimate.ci_high:.4f}] "
+             f"\\quad \\text{{(standard error {estimate.std_error:.4f})}}")
+
+@instrumented
 def call_option_asset(end_values, strike_value):
-    payoffs = end_values - strike_value
-    payoffs = np.clip(payoffs, 0, None)
+    estimate = mc_estimate(call_payoff(end_values, strike_value))
     st.latex("\\text{Simulated Fair Price: }")
-    st.latex(payoffs.mean())
-    return payoffs.mean()
+    st.latex(estimate.price)
+    _show_confidence_interval(estimate)
+    return estimate.price
+
+@instrumented
+def variance_reduced_call_asset(s0, mu, sigma, T, strike_value, num_paths=200, seed=None):
+    current_profiler().count('paths', num_paths)
+    estimate = price_european_mc(s0, mu, sigma, T, strike_value, num_paths=num_paths, seed=seed,
+                                 antithetic=True, control_variate='stock')
+    st.latex("\\text{Variance Reduced Simulated Price: }")
+    st.latex(estimate.price)
+    _show_confidence_interval(estimate)
+    return estimate
+
+@instrumented
+def black_scholes_asset(s0, strike_value, T, sigma):
+    greeks = bs_greeks(s0, strike_value, T, sigma)
+    st.latex("\\text{Black-Scholes Price: }")
+    st.latex(float(greeks.price))
+    st.latex(f"\\Delta = {float(greeks.delta):.4f} \\quad \\Gamma = {float(greeks.gamma):.4f} \\quad "
+             f"\\text{{Vega}} = {float(greeks.vega):.4f} \\quad \\Theta = {float(greeks.theta):.4f} \\quad \\rho = {float(greeks.rho):.4f}")
+    return greeks
+
+@instrumented
+def streaming_call_asset(s0, mu, sigma, T, strike_value, rel_tol=5e-5, max_paths=1_000_000, seed=None):
+    # the tolerance scales with s0 (rel_tol=5e-5 is 1 cent at 200), and max_paths rather than a time
+    # budget caps the work, so the same seed always shows the same price whatever the machine
+    tol = rel_tol*s0
+    result = streaming_price(terminal_batches(s0, mu, sigma, T=T, batch_size=10_000, seed=seed), strike_value,
+                             tol=tol, max_paths=max_paths)
+    current_profiler().count('paths', result.estimate.num_samples)
+    st.latex("\\text{Simulated Price (until the standard error is below }" + f"{tol:g}" + "\\text{): }")
+    st.latex(result.estimate.price)
+    _show_confidence_interval(result.estimate)
+    if result.stopped == 'tolerance':
+        st.latex(f"\\text{{{result.estimate.num_samples:,} paths needed}}")
+    else:
+        st.latex(f"\\text{{stopped at the limit of {result.estimate.num_samples:,} paths}}")
+    return result
+
+@instrumented
+def delta_hedging_asset(s0, strike_value, implied_vol, realized_vols, n=24, T=30, num_paths=1000, seed=None):
+    # buy the call at implied_vol and delta hedge it every step, once per realized vol
+    current_profiler().count('paths', num_paths*len(realized_vols))
+    results = {}
+    for sigma in realized_vols:
+        results[sigma] = simulation_cache.delta_hedge(s0, 0.0, sigma, strike_value, implied_vol, n=n, T=T, num_paths=num_paths,
+                                                      seed=seed)
+    fig = pnl_histogram_figure({f'Realized vol {sigma*1e3:g}': result.pnl for sigma, result in results.items()},
+                               title=f'Delta-Hedged Call P&L (Bought at Implied Vol {implied_vol*1e3:g})')
+    plot_chart(fig)
+    return results
+
+@instrumented
+def exotic_options_asset(s0, sigma, T, strike_value, barrier, n=4, num_paths=200, seed=None):
+    # every payoff here reads the whole of the same simulated paths, not just the last column. It runs on
+    # every slider move, so the defaults keep it small: 4 steps a day, with the barrier's bridge
+    # correction accounting for touches between steps
+    current_profiler().count('paths', num_paths)
+    sim = simulation_cache.simulate_gbm(s0, 0.0, sigma, n=n, T=T, num_paths=num_paths, seed=seed)
+    payoffs = {
+        "\\text{Asian call (strike vs. the average price): }": asian_payoff(sim.paths, strike_value),
+        f"\\text{{Up-and-out call (worthless if the stock ever touches {barrier}): }}":
+            barrier_payoff(sim.t, sim.paths, strike_value, barrier, 'up-and-out', sigma=sigma),
+        "\\text{Lookback call (buy at the lowest price): }": lookback_payoff(sim.paths),
+    }
+    estimates = {}
+    for label, payoff in payoffs.items():
+        estimates[label] = estimate = mc_estimate(payoff)
+        st.latex(label)
+        st.latex(estimate.price)
+        _show_confidence_interval(estimate)
+    return estimates